@@ -1,26 +1,46 @@
 # dashboard_defense_japon_avance.py
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime, timedelta
+from simulation_japon import (
+    DefenseJaponSimulation, LRUCache, LazyModule, Profiler, content_hash, make_cache_key, main,
+    HORIZON_DEBUT, HORIZON_FIN, RESOLUTIONS, SCENARIOS, MONTE_CARLO_SERIES, MONTE_CARLO_TRAJECTOIRES,
+    DATASET_CACHE_MAX_ENTRIES, WHATIF_CACHE_MAX_ENTRIES, METRICS, METRICS_PORT, RERUN_SECONDS, FIGURE_BYTES, FIGURE_BYTES_SAVED,
+    WHATIF_SECONDS, SERIES_TABLE, STORE_DIR, SharedStore, source_version, parse_port_range, start_metrics_server,
+    WARM_CACHES, WARM_INTERVAL, WARM_WORKERS, WARMUP_PROGRESS, WARMUP_SECONDS
+)
+import simulation_japon
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import atexit
+import base64
+import functools
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
-# Configuration de la page
-st.set_page_config(
-    page_title="Analyse Stratégique Avancée - Japon",
-    page_icon="🗾",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Bibliothèques de graphiques chargées au premier graphique effectivement rendu
+pd = LazyModule('pandas')
+px = LazyModule('plotly.express')
+go = LazyModule('plotly.graph_objects')
+
+LOGGER = logging.getLogger(__name__)
+
+def make_subplots(*args, **kwargs):
+    """Import différé de plotly.subplots"""
+    from plotly.subplots import make_subplots as _make_subplots
+    return _make_subplots(*args, **kwargs)
+
 
 # CSS personnalisé avancé avec couleurs japonaises
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 2.8rem;
@@ -98,319 +118,450 @@ st.markdown("""
         margin: 0.5rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-class DefenseJaponDashboardAvance:
-    def __init__(self):
-        self.branches_options = self.define_branches_options()
-        self.programmes_options = self.define_programmes_options()
-        self.missile_systems = self.define_missile_systems()
-        self.naval_assets = self.define_naval_assets()
-        
-    def define_branches_options(self):
-        return [
-            "Forces d'Auto-Défense Japonaises", "Forces Terrestres d'Auto-Défense", 
-            "Forces Maritimes d'Auto-Défense", "Forces Aériennes d'Auto-Défense",
-            "Commandement de la Défense Spatiale", "Commandement Cyber",
-            "Garde Côtière Japonaise", "Unité des Opérations Spéciales"
-        ]
-    
-    def define_programmes_options(self):
-        return [
-            "Défense Anti-Missile Intégrée", "Capacités de Contre-Attaque",
-            "Défense des Îles Éloignées", "Modernisation des Forces Maritimes",
-            "Supériorité Aérospatiale", "Coopération Alliance USA-Japon",
-            "Cyber Défense Avancée", "Défense Spatiale"
-        ]
-    
-    def define_missile_systems(self):
-        return {
-            "SM-3 Block IIA": {"type": "Interceptor ABM", "portee": 2500, "altitude": 1000, "statut": "Opérationnel"},
-            "PAC-3 MSE": {"type": "Défense AA/BM", "portee": 35, "altitude": 20, "statut": "Opérationnel"},
-            "Type 03 Chu-SAM": {"type": "Défense AA", "portee": 50, "altitude": 10, "statut": "Opérationnel"},
-            "12-Type SSM": {"type": "Missile Anti-Navire", "portee": 200, "vitesse": "Mach 0.9", "statut": "Opérationnel"},
-            "ASM-3": {"type": "Missile Air-Sol", "portee": 400, "vitesse": "Mach 3", "statut": "Déploiement"}
-        }
-    
-    def define_naval_assets(self):
-        return {
-            "Classe Izumo": {"type": "Porte-hélicoptères", "deplacement": 27000, "aeronav": "28 hélicoptères", "statut": "Opérationnel"},
-            "Classe Maya": {"type": "Destroyer AEGIS", "deplacement": 10800, "armement": "SM-3, SM-6", "statut": "Opérationnel"},
-            "Classe Soryu": {"type": "Sous-marin", "deplacement": 4200, "propulsion": "AIP", "statut": "Opérationnel"},
-            "Classe Mogami": {"type": "Frégate", "deplacement": 5500, "armement": "Missiles mer-mer", "statut": "Opérationnel"}
-        }
-    
-    def generate_advanced_data(self, selection):
-        """Génère des données avancées et détaillées pour le Japon"""
-        annees = list(range(2000, 2028))
-        
-        config = self.get_advanced_config(selection)
-        
-        data = {
-            'Annee': annees,
-            'Budget_Defense_Mds': self.simulate_advanced_budget(annees, config),
-            'Personnel_Milliers': self.simulate_advanced_personnel(annees, config),
-            'PIB_Militaire_Pourcent': self.simulate_military_gdp_percentage(annees),
-            'Exercices_Militaires': self.simulate_advanced_exercises(annees, config),
-            'Readiness_Operative': self.simulate_advanced_readiness(annees),
-            'Capacite_Defense': self.simulate_advanced_defense(annees),
-            'Temps_Reponse_Jours': self.simulate_advanced_response(annees),
-            'Tests_Intercepteurs': self.simulate_interceptor_tests(annees),
-            'Developpement_Technologique': self.simulate_tech_development(annees),
-            'Capacite_Anti_Access': self.simulate_a2ad_capacity(annees),
-            'Couverture_BMD': self.simulate_bmd_coverage(annees),
-            'Resilience_Cyber': self.simulate_cyber_resilience(annees),
-            'Capacites_ISR': self.simulate_isr_capabilities(annees),
-            'Cooperation_USA': self.simulate_us_cooperation(annees)
-        }
-        
-        # Données spécifiques aux programmes
-        if 'defense_missile' in config.get('priorites', []):
-            data.update({
-                'Intercepteurs_BMD': self.simulate_bmd_interceptors(annees),
-                'Couverture_Radar': self.simulate_radar_coverage(annees),
-                'Taux_Interception': self.simulate_interception_rate(annees)
-            })
-        
-        if 'maritime' in config.get('priorites', []):
-            data.update({
-                'Navires_Combat': self.simulate_naval_vessels(annees),
-                'Destroyers_AEGIS': self.simulate_aegis_destroyers(annees),
-                'Sous_Marins': self.simulate_submarines(annees)
-            })
-        
-        if 'aerospatial' in config.get('priorites', []):
-            data.update({
-                'Satellites_Militaires': self.simulate_military_satellites(annees),
-                'Capacite_Antisatellite': self.simulate_antisatellite_capability(annees),
-                'Avions_Combat': self.simulate_fighter_aircraft(annees)
-            })
-        
-        if 'cyber' in config.get('priorites', []):
-            data.update({
-                'Cyber_Defense_Niveau': self.simulate_cyber_defense(annees),
-                'Reseau_Commandement_Cyber': self.simulate_cyber_command(annees),
-                'Incidents_Cyber_Controles': self.simulate_cyber_incidents(annees)
-            })
-        
-        return pd.DataFrame(data), config
-    
-    def get_advanced_config(self, selection):
-        """Configuration avancée avec plus de détails pour le Japon"""
-        configs = {
-            "Forces d'Auto-Défense Japonaises": {
-                "type": "armee_totale",
-                "budget_base": 50.0,
-                "personnel_base": 240,
-                "exercices_base": 80,
-                "priorites": ["defense_missile", "maritime", "aerospatial", "cyber", "alliance"],
-                "doctrines": ["Défense Collective", "Réponse Dynamique", "Dissuasion Intégrée"],
-                "capacites_speciales": ["Défense BMD", "Opérations Amphibies", "Guerre ASW"]
-            },
-            "Forces Maritimes d'Auto-Défense": {
-                "type": "branche_navale",
-                "personnel_base": 45,
-                "exercices_base": 25,
-                "priorites": ["bmd", "asw", "amphibie", "mines"],
-                "flottes_principales": ["Flotte d'Escorte", "Flotte Sous-marine", "Aviation Navale"],
-                "navires_cles": ["Destroyers AEGIS", "Sous-marins Soryu", "Porte-hélicoptères Izumo"]
-            },
-            "Forces Aériennes d'Auto-Défense": {
-                "type": "branche_aerienne",
-                "personnel_base": 50,
-                "exercices_base": 30,
-                "priorites": ["interception", "bmd", "isr", "transport"],
-                "squadrons_cles": ["F-15J", "F-2", "F-35A", "E-767 AWACS"],
-                "bases_principales": ["Kadena", "Misawa", "Hyakuri"]
-            },
-            "Défense Anti-Missile Intégrée": {
-                "type": "programme_strategique",
-                "budget_base": 8.0,
-                "priorites": ["intercepteurs", "radars", "commandement", "integration_usa"],
-                "composantes": ["AEGIS Ashore", "PAC-3", "SM-3", "Radars J/FPS-5"],
-                "couverture": "Archipel japonais et bases US"
-            }
-        }
-        
-        return configs.get(selection, {
-            "type": "branche",
-            "personnel_base": 30,
-            "exercices_base": 20,
-            "priorites": ["defense_generique"]
-        })
-    
-    def simulate_advanced_budget(self, annees, config):
-        """Simulation avancée du budget avec augmentations récentes"""
-        budget_base = config.get('budget_base', 45.0)
-        budgets = []
-        for annee in annees:
-            base = budget_base * (1 + 0.02 * (annee - 2000))  # Croissance modérée
-            # Augmentations selon périodes
-            if 2006 <= annee <= 2010:  # Post-9/11 et menaces nord-coréennes
-                base *= 1.05
-            elif 2012 <= annee <= 2015:  # Tensions Senkaku/Diaoyu
-                base *= 1.08
-            elif annee >= 2018:  # Modernisation face à la Chine
-                base *= 1.12
-            elif annee >= 2022:  # Sécurité nationale renforcée
-                base *= 1.25
-            budgets.append(base)
-        return budgets
-    
-    def simulate_advanced_personnel(self, annees, config):
-        """Simulation avancée des effectifs professionnels"""
-        personnel_base = config.get('personnel_base', 250)
-        # Légère augmentation avec professionnalisation
-        return [personnel_base * (1 + 0.003 * (annee - 2000)) for annee in annees]
-    
-    def simulate_military_gdp_percentage(self, annees):
-        """Pourcentage du PIB consacré à la défense"""
-        return [0.9 + 0.05 * (annee - 2000) for annee in annees]
-    
-    def simulate_advanced_exercises(self, annees, config):
-        """Exercices militaires avec coopération US"""
-        base = config.get('exercices_base', 60)
-        return [base + 3 * (annee - 2000) + 8 * np.sin(2 * np.pi * (annee - 2000)/2) for annee in annees]
-    
-    def simulate_advanced_readiness(self, annees):
-        """Préparation opérationnelle avancée"""
-        readiness = []
-        for annee in annees:
-            base = 85 + 0.5 * (annee - 2000)  # Départ élevé, amélioration continue
-            if annee >= 2006:  # Réformes post-9/11
-                base += 5
-            if annee >= 2014:  # Modernisation
-                base += 4
-            if annee >= 2020:  # Préparation accrue
-                base += 3
-            readiness.append(min(base, 96))
-        return readiness
-    
-    def simulate_advanced_defense(self, annees):
-        """Capacité de défense avancée"""
-        defense = []
-        for annee in annees:
-            base = 80  # Défense solide
-            if annee >= 2007:
-                base += 3  # Systèmes BMD
-            if annee >= 2015:
-                base += 6  # Modernisation
-            if annee >= 2021:
-                base += 5  # Contre-mesures avancées
-            defense.append(min(base, 94))
-        return defense
-    
-    def simulate_advanced_response(self, annees):
-        """Temps de réponse avancé"""
-        return [max(10 - 0.3 * (annee - 2000), 3) for annee in annees]
+def configure_page():
+    """Configuration de la page et CSS, appliqués uniquement au lancement du dashboard"""
+    st.set_page_config(
+        page_title="Analyse Stratégique Avancée - Japon",
+        page_icon="🗾",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+# Rendu paresseux des onglets: seules les figures de l'onglet actif sont construites
+LAZY_TABS = True
+
+# Nombre maximal de points affichés par trace, de l'ordre de la largeur d'un graphique en pixels
+DISPLAY_MAX_POINTS = 500
+
+# Au-delà de ce nombre de points envoyés (après sous-échantillonnage), les traces passent en rendu WebGL
+# (Scattergl). Inférieur à DISPLAY_MAX_POINTS: une série longue, réduite à ce plafond, passe en WebGL
+WEBGL_THRESHOLD = 400
+
+# En deçà de cette longueur, un tableau numérique reste en texte (l'en-tête base64 coûterait plus)
+TYPED_ARRAY_MIN_LENGTH = 8
+
+# Sous-graphes dont le modèle Plotly fixe les valeurs par défaut, et types de traces qui les utilisent
+MODELE_SOUS_GRAPHES = {
+    'polar': {'scatterpolar', 'scatterpolargl', 'barpolar'},
+    'ternary': {'scatterternary'},
+    'scene': {'scatter3d', 'surface', 'mesh3d', 'cone', 'streamtube', 'isosurface', 'volume'},
+    'geo': {'scattergeo', 'choropleth'}
+}
+
+# Nombre maximal de figures sérialisées conservées en cache
+FIGURE_CACHE_MAX_ENTRIES = 256
+
+# Magasin privé du préchauffage sans DEFENSE_JAPON_STORE_DIR: un répertoire temporaire
+# par processus serveur (pid dans le nom), supprimé à sa sortie
+PRIVATE_STORE_PREFIX = 'defense_japon_store_'
+PRIVATE_STORE_MAX_BYTES = 64 * 1024 * 1024
+
+# Options avancées du sidebar et onglet qu'elles pilotent: chaque case est rendue par
+# le fragment de son onglet, la cocher ne relance que cet onglet
+OPTIONS_ONGLETS = {
+    'show_geopolitical': ("Contexte géopolitique", "🌍 Contexte Géopolitique"),
+    'show_doctrinal': ("Analyse doctrinale", "📚 Doctrine Militaire"),
+    'show_technical': ("Détails techniques", "🛡️ Systèmes Défensifs"),
+    'threat_assessment': ("Évaluation des menaces", "⚠️ Évaluation Menaces")
+}
+
+# Jeux de données en cache au schéma typé compact (int16/float32, catégories)
+DATASET_COMPACT = True
+
+# Curseurs what-if: clé de config -> (libellé, minimum, maximum, pas)
+WHATIF_PARAMETRES = {
+    'budget_base': ("Budget de base (Md$)", 5.0, 100.0, 0.5),
+    'personnel_base': ("Effectifs de base (milliers)", 10, 400, 5),
+    'exercices_base': ("Exercices de base", 0, 200, 5),
+    'croissance_budget': ("Croissance du budget (/an)", 0.0, 0.1, 0.005),
+    'croissance_personnel': ("Croissance des effectifs (/an)", -0.02, 0.02, 0.001)
+}
+
+# Budget de latence d'un recalcul what-if (changement de curseur -> données du graphique)
+WHATIF_LATENCY_BUDGET_MS = 50
+
+# Styles de trait des sélections superposées en mode comparaison
+COMPARAISON_TIRETS = ['solid', 'dash', 'dot', 'dashdot', 'longdash', 'longdashdot']
+
+def lttb_indices(x, y, max_points=DISPLAY_MAX_POINTS):
+    """Indices retenus par Largest-Triangle-Three-Buckets (extrémités conservées)"""
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
     
-    def simulate_interceptor_tests(self, annees):
-        """Tests d'intercepteurs"""
-        tests = []
-        for annee in annees:
-            if annee < 2006:
-                tests.append(2)
-            elif annee < 2012:
-                tests.append(4 + (annee - 2006))
-            elif annee < 2018:
-                tests.append(8 + 2 * (annee - 2012))
-            else:
-                tests.append(15 + 3 * (annee - 2018))
-        return tests
+    # max_points - 2 seaux entre le premier et le dernier point
+    bornes = np.linspace(1, n - 1, max_points - 1).astype(int)
+    indices = np.empty(max_points, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    precedent = 0
+    for b in range(max_points - 2):
+        debut, fin = bornes[b], bornes[b + 1]
+        suivant_fin = bornes[b + 2] if b + 2 < len(bornes) else n
+        x_moyen = x[fin:suivant_fin].mean()
+        y_moyen = y[fin:suivant_fin].mean()
+        # Aire du triangle (point précédent retenu, candidat, moyenne du seau suivant)
+        aires = np.abs((x[precedent] - x_moyen) * (y[debut:fin] - y[precedent])
+                       - (x[precedent] - x[debut:fin]) * (y_moyen - y[precedent]))
+        precedent = debut + int(np.argmax(aires))
+        indices[b + 1] = precedent
+    return indices
+
+def minmax_indices(y, max_points=DISPLAY_MAX_POINTS):
+    """Indices des minimum et maximum de chaque seau (extrémités conservées)"""
+    n = len(y)
+    if n <= max_points or max_points < 4:
+        return np.arange(n)
+    # Deux points par seau, plus les deux extrémités: au plus max_points indices
+    taille = int(np.ceil(n / ((max_points - 2) // 2)))
+    n_seaux = int(np.ceil(n / taille))
+    seaux = np.full(n_seaux * taille, np.nan)
+    seaux[:n] = np.asarray(y, dtype=float)
+    seaux = seaux.reshape(n_seaux, taille)
+    decalage = np.arange(n_seaux) * taille
+    indices = np.concatenate([[0, n - 1], decalage + np.nanargmin(seaux, axis=1),
+                              decalage + np.nanargmax(seaux, axis=1)])
+    return np.unique(indices)
+
+def line_trace(x, y, indices=None, **kwargs):
+    """Trace Plotly sous-échantillonnée côté serveur, en WebGL au-delà de WEBGL_THRESHOLD points retenus
     
-    def simulate_tech_development(self, annees):
-        """Développement technologique global"""
-        return [min(80 + 1.2 * (annee - 2000), 95) for annee in annees]
+    Les points retenus sont des points d'origine (pas de moyenne): les valeurs
+    affichées au survol restent exactes. Par défaut les indices viennent de LTTB.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    if indices is None:
+        indices = lttb_indices(x, y)
+    if 'customdata' in kwargs:
+        kwargs['customdata'] = np.asarray(kwargs['customdata'])[indices]
+    trace = go.Scattergl if len(indices) > WEBGL_THRESHOLD else go.Scatter
+    return trace(x=x[indices], y=y[indices], **kwargs)
+
+def typed_array(valeurs):
+    """Tableau typé Plotly (base64) au plus petit dtype sans perte, None si non numérique 1D"""
+    tableau = np.asarray(valeurs)
+    if tableau.ndim != 1 or len(tableau) < TYPED_ARRAY_MIN_LENGTH or tableau.dtype.kind not in 'iuf':
+        return None
+    if tableau.dtype.kind == 'f':
+        reduit = tableau.astype(np.float32)
+        if np.array_equal(reduit, tableau, equal_nan=True):
+            tableau = reduit
+    else:
+        # Plotly.js ne lit pas les entiers 64 bits: plus petit type entier qui contient les valeurs
+        minimum, maximum = tableau.min(), tableau.max()
+        for dtype in (np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32, np.float64):
+            if dtype is np.float64 or np.iinfo(dtype).min <= minimum and maximum <= np.iinfo(dtype).max:
+                tableau = tableau.astype(dtype)
+                break
+    tableau = tableau.astype(tableau.dtype.newbyteorder('<'), copy=False)
+    return {'dtype': tableau.dtype.str[1:], 'bdata': base64.b64encode(tableau.tobytes()).decode('ascii')}
+
+def encode_arrays(objet):
+    """Remplace récursivement les tableaux numériques d'une trace par des tableaux typés"""
+    if isinstance(objet, dict):
+        if 'bdata' in objet:
+            # Tableau déjà typé par Plotly (tableaux numpy): réduit au plus petit dtype sans perte
+            if 'shape' in objet or not isinstance(objet['bdata'], str):
+                return objet
+            tableau = np.frombuffer(base64.b64decode(objet['bdata']), dtype=np.dtype(objet['dtype']).newbyteorder('<'))
+            return typed_array(tableau) or objet
+        return {cle: encode_arrays(valeur) for cle, valeur in objet.items()}
+    if isinstance(objet, (list, tuple, np.ndarray)):
+        encode = typed_array(objet) if len(objet) and not isinstance(objet[0], (str, bool)) else None
+        if encode is not None:
+            return encode
+        return objet if isinstance(objet, np.ndarray) else [encode_arrays(valeur) for valeur in objet]
+    return objet
+
+def compact_figure(fig):
+    """Figure allégée: tableaux numériques en binaire base64, modèle réduit aux types de traces présents"""
+    spec = fig.to_plotly_json()
+    spec['data'] = [encode_arrays(trace) for trace in spec['data']]
+    modele = spec['layout'].get('template')
+    if modele and 'data' in modele:
+        # Les valeurs par défaut des types de traces absents n'ont aucun effet sur le rendu
+        types = {trace.get('type', 'scatter') for trace in spec['data']}
+        modele['data'] = {nom: valeur for nom, valeur in modele['data'].items() if nom in types}
+        for sous_graphe, types_traces in MODELE_SOUS_GRAPHES.items():
+            if not types & types_traces:
+                modele.get('layout', {}).pop(sous_graphe, None)
+    return go.Figure(spec)
+
+@st.cache_resource
+def get_dataset_cache():
+    """Cache des jeux de données partagé entre les reruns et les sessions"""
+    return LRUCache(DATASET_CACHE_MAX_ENTRIES)
+
+@st.cache_resource
+def get_whatif_cache():
+    """Cache des variantes what-if, séparé pour ne pas évincer les jeux de données de référence"""
+    return LRUCache(WHATIF_CACHE_MAX_ENTRIES)
+
+@st.cache_resource
+def get_figure_cache():
+    """Cache des figures Plotly sérialisées partagé entre les reruns et les sessions"""
+    return LRUCache(FIGURE_CACHE_MAX_ENTRIES)
+
+def store_version():
+    """Version des entrées du magasin partagé: empreinte du code du modèle et du dashboard"""
+    return source_version(simulation_japon.__file__, __file__)
+
+def open_shared_store():
+    """Magasin sur disque de DEFENSE_JAPON_STORE_DIR, None s'il n'est pas configuré"""
+    if not STORE_DIR:
+        return None
+    return SharedStore(STORE_DIR, 'dashboard', store_version())
+
+def warm_selections(simulation):
+    """Sélections préchauffées: branches, programmes et scénarios géopolitiques"""
+    return simulation.branches_options + simulation.programmes_options + ["Scénarios Géopolitiques"]
+
+def offline_controls(selection, scenario, **params):
+    """Contrôles d'un rendu hors session (rapports, préchauffage): toutes les sections, sans comparaison ni what-if"""
+    return {
+        'selection': selection, 'comparaison': [], 'whatif': False, 'scenario': scenario,
+        'show_geopolitical': True, 'show_doctrinal': True, 'show_technical': True,
+        'threat_assessment': True, 'profilage': False, **params
+    }
+
+def purge_private_stores():
+    """Supprime les magasins privés laissés par des processus serveur arrêtés sans nettoyage"""
+    for repertoire in glob.glob(os.path.join(tempfile.gettempdir(), PRIVATE_STORE_PREFIX + '*')):
+        pid = os.path.basename(repertoire)[len(PRIVATE_STORE_PREFIX):].partition('_')[0]
+        if not pid.isdigit():
+            continue
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            shutil.rmtree(repertoire, ignore_errors=True)
+        except PermissionError:
+            # Processus vivant d'un autre utilisateur
+            pass
+
+def open_private_store():
+    """Magasin temporaire propre au processus serveur, supprimé à sa sortie"""
+    purge_private_stores()
+    repertoire = tempfile.mkdtemp(prefix=f'{PRIVATE_STORE_PREFIX}{os.getpid()}_')
+    atexit.register(shutil.rmtree, repertoire, ignore_errors=True)
+    return SharedStore(repertoire, 'dashboard', store_version(), PRIVATE_STORE_MAX_BYTES)
+
+@st.cache_resource
+def get_shared_store():
+    """Magasin sur disque partagé entre les processus serveur, versionné par le code du dashboard"""
+    store = open_shared_store()
+    if store is None and WARM_CACHES:
+        # Sans répertoire partagé, un magasin privé reçoit le préchauffage des processus de travail
+        store = open_private_store()
+    return store
+
+@st.cache_resource
+def get_cache_warmer():
+    """Démarre le préchauffage des caches partagés, une fois par processus serveur"""
+    dashboard = DefenseJaponDashboardAvance(
+        dataset_cache=get_dataset_cache(),
+        figure_cache=get_figure_cache(),
+        store=get_shared_store()
+    )
+    return CacheWarmer(dashboard, warm_selections(dashboard), list(SCENARIOS), WARM_INTERVAL, WARM_WORKERS).start()
+
+@st.cache_resource
+def get_metrics_server():
+    """Enregistre les caches partagés et démarre le serveur de métriques, une fois par processus"""
+    METRICS.register_cache('datasets', get_dataset_cache())
+    METRICS.register_cache('whatif', get_whatif_cache())
+    METRICS.register_cache('figures', get_figure_cache())
+    if get_shared_store() is not None:
+        METRICS.register_cache('partage', get_shared_store())
+    if METRICS_PORT:
+        try:
+            ports = parse_port_range(METRICS_PORT)
+        except ValueError as erreur:
+            # Mauvaise configuration: le dashboard reste servi, sans métriques
+            LOGGER.warning("Serveur de métriques non démarré: %s", erreur)
+            return None
+        return start_metrics_server(METRICS, ports)
+    return None
+
+def fragment(fonction):
+    """st.fragment en session Streamlit, appel direct ailleurs (rapports, préchauffage, benchmarks)"""
+    fragment_streamlit = st.fragment(fonction)
     
-    def simulate_a2ad_capacity(self, annees):
-        """Capacités Anti-Access/Area Denial"""
-        return [min(70 + 2.0 * (annee - 2000), 92) for annee in annees]
+    @functools.wraps(fonction)
+    def wrapper(*args, **kwargs):
+        # Sans contexte d'exécution, st.fragment ne rendrait rien
+        if get_script_run_ctx(suppress_warning=True) is None:
+            return fonction(*args, **kwargs)
+        return fragment_streamlit(*args, **kwargs)
+    return wrapper
+
+class CacheWarmer:
+    """Préchauffe le magasin partagé dans des processus de travail, puis les jeux de données du serveur
     
-    def simulate_bmd_coverage(self, annees):
-        """Couverture de défense anti-missile balistique"""
-        return [min(60 + 3.0 * (annee - 2000), 95) for annee in annees]
+    Le calcul (séries, Monte Carlo, figures) tourne hors du processus serveur, sans
+    concurrence pour son GIL; le thread de préchauffage ne fait qu'attendre les
+    processus puis relire depuis le magasin les jeux de données et bandes par défaut.
+    """
+    def __init__(self, dashboard, selections, scenarios, interval=None, max_workers=None):
+        self.dashboard = dashboard
+        self.selections = selections
+        self.scenarios = scenarios
+        self.taches = [(selection, scenario) for selection in selections for scenario in scenarios]
+        self.interval = interval
+        self.max_workers = max_workers
+        self.termines = 0
+        self.erreurs = 0
+        self.derniere_erreur = None
+        self.debut = None
+        self.duree = None
+        self.passes = 0
+        self.prets = []
+        self._thread = None
     
-    def simulate_cyber_resilience(self, annees):
-        """Résilience cybernétique"""
-        return [min(75 + 2.2 * (annee - 2000), 94) for annee in annees]
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and self.duree is None
     
-    def simulate_isr_capabilities(self, annees):
-        """Capacités ISR (Intelligence, Surveillance, Reconnaissance)"""
-        return [min(80 + 1.8 * (annee - 2000), 96) for annee in annees]
+    def start(self):
+        self.debut = time.perf_counter()
+        self._thread = threading.Thread(target=self.run, name='defense-japon-warmup', daemon=True)
+        self._thread.start()
+        return self
     
-    def simulate_us_cooperation(self, annees):
-        """Niveau de coopération avec les USA"""
-        cooperation = []
-        for annee in annees:
-            base = 85  # Alliance solide
-            if annee >= 2001:
-                base += 5  # Post-9/11
-            if annee >= 2012:
-                base += 3  # Pivot vers l'Asie
-            if annee >= 2017:
-                base += 4  # Coopération renforcée
-            cooperation.append(min(base, 98))
-        return cooperation
+    def run(self):
+        while True:
+            self.warm_all()
+            if not self.interval:
+                return
+            time.sleep(self.interval)
     
-    def simulate_bmd_interceptors(self, annees):
-        """Intercepteurs BMD déployés"""
-        return [min(10 + 2 * (annee - 2000), 50) for annee in annees]
+    def warm_all(self):
+        """Une passe complète sur toutes les combinaisons, avancement exporté en métriques"""
+        self.termines, self.erreurs, self.duree, self.prets = 0, 0, None, []
+        self.debut = time.perf_counter()
+        import reports
+        
+        params = {'debut': HORIZON_DEBUT, 'fin': HORIZON_FIN, 'periodes_par_an': 1}
+        # spawn: pas de fork d'un serveur multi-thread (verrous hérités)
+        echecs = reports.warm_store(
+            self.dashboard.store, self.selections, self.scenarios, self.max_workers,
+            progress=self.advance, mp_context=multiprocessing.get_context('spawn'), **params)
+        if echecs:
+            self.derniere_erreur = echecs[-1]
+        # Lectures du magasin (combinaisons réussies seulement): les figures suivent à la première demande
+        for selection, scenario in self.prets:
+            self.dashboard.get_cached_data(selection, compact=DATASET_COMPACT, **params)
+            self.dashboard.get_cached_scenario_bands(selection, scenario, compact=DATASET_COMPACT, **params)
+        self.duree = time.perf_counter() - self.debut
+        self.passes += 1
+        WARMUP_SECONDS.set(self.duree)
     
-    def simulate_radar_coverage(self, annees):
-        """Couverture radar"""
-        return [min(70 + 2.5 * (annee - 2000), 95) for annee in annees]
+    def advance(self, selection, scenario, erreur):
+        """Une combinaison terminée par un processus de travail"""
+        if erreur is not None:
+            # Une combinaison en échec n'interrompt pas le préchauffage des suivantes
+            self.erreurs += 1
+        else:
+            self.prets.append((selection, scenario))
+        self.termines += 1
+        WARMUP_PROGRESS.set(self.termines / len(self.taches))
     
-    def simulate_interception_rate(self, annees):
-        """Taux d'interception estimé"""
-        return [min(75 + 1.5 * (annee - 2000), 92) for annee in annees]
+    def progress(self):
+        """Texte d'avancement pour le panneau de contrôle"""
+        if self.running:
+            return (f"🔥 Préchauffage des caches: {self.termines}/{len(self.taches)} "
+                    f"({time.perf_counter() - self.debut:.1f} s)")
+        if self.duree is not None:
+            erreurs = f", {self.erreurs} erreur(s)" if self.erreurs else ""
+            return f"✅ Caches préchauffés: {len(self.taches)} combinaisons en {self.duree:.1f} s{erreurs}"
+        return None
+
+class DefenseJaponDashboardAvance(DefenseJaponSimulation):
+    def __init__(self, dataset_cache=None, figure_cache=None, store=None, whatif_cache=None):
+        super().__init__(dataset_cache, store=store, whatif_cache=whatif_cache)
+        self.figure_cache = figure_cache if figure_cache is not None else LRUCache(FIGURE_CACHE_MAX_ENTRIES)
+        self.onglet_courant = None
+        # Clé du jeu de données des onglets en cours de rendu (figures dérivées mises en cache)
+        self.cle_donnees = None
     
-    def simulate_naval_vessels(self, annees):
-        """Nombre de navires de combat"""
-        return [min(120 + 3 * (annee - 2000), 160) for annee in annees]
+    @property
+    def mesure_payloads(self):
+        """Octets économisés mesurés hors cache: seulement en profilage de la session"""
+        return self.profiler is not None
     
-    def simulate_aegis_destroyers(self, annees):
-        """Destroyers AEGIS"""
-        aegis = []
-        for annee in annees:
-            if annee < 2007:
-                aegis.append(4)
-            elif annee < 2012:
-                aegis.append(6)
-            elif annee < 2018:
-                aegis.append(8)
-            else:
-                aegis.append(10 + (annee - 2018))
-        return [min(a, 15) for a in aegis]
+    def compact_chart(self, fig, mesure=None):
+        """Figure allégée (compact_figure), octets économisés et taille envoyée, None si non mesurés (défaut: mesure_payloads)"""
+        compacte = compact_figure(fig)
+        if not (self.mesure_payloads if mesure is None else mesure):
+            return compacte, None, None
+        octets = len(compacte.to_json())
+        return compacte, len(fig.to_json()) - octets, octets
     
-    def simulate_submarines(self, annees):
-        """Sous-marins en service"""
-        return [min(16 + 0.5 * (annee - 2000), 24) for annee in annees]
+    def load_figure(self, key, build):
+        """Figure allégée, octets économisés et taille du JSON depuis le cache de JSON Plotly, construite au besoin"""
+        def compute():
+            # Mesuré une fois au remplissage d'un cache effectif: l'entrée sert ensuite à
+            # toutes les sessions, profilées ou non
+            fig, economises, _ = self.compact_chart(build(), self.mesure_payloads or self.figure_cache.max_entries > 0)
+            return fig.to_json(), economises
+        
+        fig_json, economises = self.figure_cache.get_or_compute(
+            key, lambda: self.shared_compute(('figure', key), compute))
+        # Le cache évite la construction et l'allègement, pas la validation: go.Figure revalide
+        # toute la spécification (~5 ms par figure) et st.plotly_chart la resérialise ensuite.
+        # Lui passer le dict ne ferait que déplacer cette validation dans Streamlit.
+        return go.Figure(json.loads(fig_json)), economises, len(fig_json)
     
-    def simulate_military_satellites(self, annees):
-        """Satellites militaires en orbite"""
-        return [min(5 + 1.5 * (annee - 2000), 20) for annee in annees]
+    def get_cached_figure(self, data, layout, build):
+        """Retourne une figure (octets économisés, taille du JSON) depuis le cache, indexé par empreinte du contenu"""
+        return self.load_figure(content_hash(build.__qualname__, data, layout), lambda: build(data, layout))
     
-    def simulate_antisatellite_capability(self, annees):
-        """Capacité antisatellite"""
-        return [min(40 + 2.5 * (annee - 2000), 85) for annee in annees]
+    def get_keyed_figure(self, key, build):
+        """Retourne une figure dérivée d'un jeu de données en cache, indexée par la clé de ce jeu (None: sans cache)"""
+        if key is None:
+            return self.compact_chart(build())
+        return self.load_figure(key, build)
     
-    def simulate_fighter_aircraft(self, annees):
-        """Avions de combat"""
-        return [min(250 + 5 * (annee - 2000), 350) for annee in annees]
+    def enable_profiling(self, profiler):
+        """Active aussi le chronométrage des méthodes de rendu (display_*, create_*)"""
+        super().enable_profiling(profiler)
+        for nom in dir(self):
+            if nom.startswith('display_') or nom.startswith('create_'):
+                setattr(self, nom, profiler.wrap(getattr(self, nom), nom, 'rendu'))
     
-    def simulate_cyber_defense(self, annees):
-        """Capacités de cyber défense"""
-        return [min(80 + 1.8 * (annee - 2000), 95) for annee in annees]
+    def render_chart(self, fig):
+        """Allège puis affiche une figure Plotly construite à ce rerun (hors cache)"""
+        self.send_chart(*self.compact_chart(fig))
     
-    def simulate_cyber_command(self, annees):
-        """Réseau de commandement cyber"""
-        return [min(75 + 2.0 * (annee - 2000), 93) for annee in annees]
+    def send_chart(self, fig, economises=None, octets=None):
+        """Affiche une figure déjà allégée (payload et octets économisés enregistrés en profilage ou métriques)"""
+        # Hors onglet (préchauffage en arrière-plan), rien n'est envoyé au navigateur
+        if self.profiler is not None or (METRICS_PORT and self.onglet_courant is not None):
+            if octets is None:
+                # Figure hors cache sans profilage: une sérialisation, pour la taille seulement
+                octets = len(fig.to_json())
+            if self.profiler is not None:
+                self.profiler.record_payload(fig.layout.title.text or 'figure', octets, economises or 0)
+            FIGURE_BYTES.inc(octets, onglet=self.onglet_courant or 'aucun')
+            if economises is not None:
+                FIGURE_BYTES_SAVED.inc(economises, onglet=self.onglet_courant or 'aucun')
+        st.plotly_chart(fig, use_container_width=True)
     
-    def simulate_cyber_incidents(self, annees):
-        """Incidents cyber contrôlés (%)"""
-        return [min(85 + 1.0 * (annee - 2000), 97) for annee in annees]
+    def cache_stats(self):
+        """Compteurs hit/miss des caches de données et de figures (et du magasin partagé s'il existe)"""
+        stats = {
+            'datasets': self.dataset_cache.stats(),
+            'whatif': self.whatif_cache.stats(),
+            'figures': self.figure_cache.stats()
+        }
+        if self.store is not None:
+            stats['partage'] = self.store.stats()
+        return stats
     
-    def display_advanced_header(self):
+    def display_advanced_header(self, debut=HORIZON_DEBUT, fin=HORIZON_FIN):
         """En-tête avancé avec plus d'informations"""
         st.markdown('<h1 class="main-header">🗾 ANALYSE STRATÉGIQUE AVANCÉE - JAPON</h1>', 
                    unsafe_allow_html=True)
@@ -421,9 +572,9 @@ class DefenseJaponDashboardAvance:
             <div style='text-align: center; background: linear-gradient(135deg, #BC002D, #FFFFFF); 
             padding: 1rem; border-radius: 10px; color: white; margin: 1rem 0;'>
             <h3>🛡️ FORCES D'AUTO-DÉFENSE JAPONAISES - SYSTÈME DE DÉFENSE INTÉGRÉ</h3>
-            <p><strong>Analyse multidimensionnelle des capacités défensives et stratégiques (2000-2027)</strong></p>
+            <p><strong>Analyse multidimensionnelle des capacités défensives et stratégiques ({}-{})</strong></p>
             </div>
-            """, unsafe_allow_html=True)
+            """.format(debut, fin), unsafe_allow_html=True)
     
     def create_advanced_sidebar(self):
         """Sidebar avancé avec plus d'options"""
@@ -444,25 +595,35 @@ class DefenseJaponDashboardAvance:
         else:
             selection = "Scénarios Géopolitiques"
         
+        # Mode comparaison: sélections superposées dans l'analyse multidimensionnelle
+        comparaison = st.sidebar.multiselect(
+            "Comparer avec:",
+            [option for option in self.branches_options + self.programmes_options if option != selection]
+        )
+        
         # Options avancées
         st.sidebar.markdown("### 🔧 OPTIONS AVANCÉES")
-        show_geopolitical = st.sidebar.checkbox("Contexte géopolitique", value=True)
-        show_doctrinal = st.sidebar.checkbox("Analyse doctrinale", value=True)
-        show_technical = st.sidebar.checkbox("Détails techniques", value=True)
-        threat_assessment = st.sidebar.checkbox("Évaluation des menaces", value=True)
+        # Emplacements des cases, remplis par le fragment de l'onglet concerné (display_section)
+        self.options_sidebar = {cle: st.sidebar.container() for cle in OPTIONS_ONGLETS}
+        profilage = st.sidebar.checkbox("Mode profilage (panneau Performance)", value=False)
         
         # Paramètres de simulation
         st.sidebar.markdown("### ⚙️ PARAMÈTRES DE SIMULATION")
-        scenario = st.sidebar.selectbox("Scénario:", ["Statut Quo", "Crise Taïwan", "Attaque Nord-Coréenne", "Conflit Territorial"])
+        scenario = st.sidebar.selectbox("Scénario:", list(SCENARIOS))
+        debut, fin = st.sidebar.slider("Horizon de simulation:", 2000, 2100, (HORIZON_DEBUT, HORIZON_FIN))
+        resolution = st.sidebar.selectbox("Résolution temporelle:", list(RESOLUTIONS))
         
         return {
             'selection': selection,
+            'comparaison': comparaison,
+            'whatif': True,
             'type_analyse': type_analyse,
-            'show_geopolitical': show_geopolitical,
-            'show_doctrinal': show_doctrinal,
-            'show_technical': show_technical,
-            'threat_assessment': threat_assessment,
-            'scenario': scenario
+            **{cle: st.session_state.get(cle, True) for cle in OPTIONS_ONGLETS},
+            'profilage': profilage,
+            'scenario': scenario,
+            'debut': debut,
+            'fin': fin,
+            'periodes_par_an': RESOLUTIONS[resolution]
         }
     
     def display_strategic_metrics(self, df, config):
@@ -470,9 +631,9 @@ class DefenseJaponDashboardAvance:
         st.markdown('<h3 class="section-header">🎯 TABLEAU DE BORD STRATÉGIQUE</h3>', 
                    unsafe_allow_html=True)
         
-        derniere_annee = df['Annee'].max()
-        data_actuelle = df[df['Annee'] == derniere_annee].iloc[0]
-        data_2000 = df[df['Annee'] == 2000].iloc[0]
+        derniere_annee = int(df['Annee'].max())
+        data_actuelle = df.iloc[-1]
+        data_initiale = df.iloc[0]
         
         # Première ligne de métriques
         col1, col2, col3, col4 = st.columns(4)
@@ -480,11 +641,11 @@ class DefenseJaponDashboardAvance:
         with col1:
             st.markdown("""
             <div class="metric-card">
-                <h4>💰 BUDGET DÉFENSE 2027</h4>
+                <h4>💰 BUDGET DÉFENSE {}</h4>
                 <h2>{:.1f} Md$</h2>
                 <p>📈 {:.1f}% du PIB</p>
             </div>
-            """.format(data_actuelle['Budget_Defense_Mds'], data_actuelle['PIB_Militaire_Pourcent']), 
+            """.format(derniere_annee, data_actuelle['Budget_Defense_Mds'], data_actuelle['PIB_Militaire_Pourcent']), 
             unsafe_allow_html=True)
         
         with col2:
@@ -522,8 +683,8 @@ class DefenseJaponDashboardAvance:
         col5, col6, col7, col8 = st.columns(4)
         
         with col5:
-            reduction_temps = ((data_2000['Temps_Reponse_Jours'] - data_actuelle['Temps_Reponse_Jours']) / 
-                             data_2000['Temps_Reponse_Jours']) * 100
+            reduction_temps = ((data_initiale['Temps_Reponse_Jours'] - data_actuelle['Temps_Reponse_Jours']) / 
+                             data_initiale['Temps_Reponse_Jours']) * 100
             st.metric(
                 "⏱️ Temps Réponse",
                 f"{data_actuelle['Temps_Reponse_Jours']:.1f} jours",
@@ -532,8 +693,8 @@ class DefenseJaponDashboardAvance:
         
         with col6:
             if 'Destroyers_AEGIS' in df.columns:
-                croissance_aegis = ((data_actuelle['Destroyers_AEGIS'] - data_2000.get('Destroyers_AEGIS', 4)) / 
-                                  data_2000.get('Destroyers_AEGIS', 4)) * 100
+                croissance_aegis = ((data_actuelle['Destroyers_AEGIS'] - data_initiale.get('Destroyers_AEGIS', 4)) / 
+                                  data_initiale.get('Destroyers_AEGIS', 4)) * 100
                 st.metric(
                     "🚢 Destroyers AEGIS",
                     f"{data_actuelle['Destroyers_AEGIS']:.0f}",
@@ -541,8 +702,8 @@ class DefenseJaponDashboardAvance:
                 )
         
         with col7:
-            croissance_bmd = ((data_actuelle['Couverture_BMD'] - data_2000['Couverture_BMD']) / 
-                            data_2000['Couverture_BMD']) * 100
+            croissance_bmd = ((data_actuelle['Couverture_BMD'] - data_initiale['Couverture_BMD']) / 
+                            data_initiale['Couverture_BMD']) * 100
             st.metric(
                 "🎯 Couverture BMD",
                 f"{data_actuelle['Couverture_BMD']:.1f}%",
@@ -553,45 +714,59 @@ class DefenseJaponDashboardAvance:
             st.metric(
                 "📊 Préparation Opérationnelle",
                 f"{data_actuelle['Readiness_Operative']:.1f}%",
-                f"+{(data_actuelle['Readiness_Operative'] - data_2000['Readiness_Operative']):.1f}%"
+                f"+{(data_actuelle['Readiness_Operative'] - data_initiale['Readiness_Operative']):.1f}%"
             )
     
-    def create_comprehensive_analysis(self, df, config):
-        """Analyse complète multidimensionnelle"""
+    def create_comprehensive_analysis(self, df, config, bandes=None, scenario=None, comparaison=None,
+                                      n_trajectoires=None):
+        """Analyse complète multidimensionnelle (sélections comparées superposées si fournies)"""
         st.markdown('<h3 class="section-header">📊 ANALYSE MULTIDIMENSIONNELLE</h3>', 
                    unsafe_allow_html=True)
         
-        # Graphiques principaux
-        col1, col2 = st.columns(2)
+        debut, fin = int(df['Annee'].min()), int(df['Annee'].max())
         
-        with col1:
-            # Évolution des capacités principales
+        def build_capacites():
             fig = go.Figure()
             
             capacites = ['Readiness_Operative', 'Capacite_Defense', 'Resilience_Cyber', 'Couverture_BMD']
             noms = ['Préparation Opér.', 'Capacité Défense', 'Résilience Cyber', 'Couverture BMD']
             couleurs = ['#BC002D', '#FFFFFF', '#2d3436', '#0d47a1']
             
-            for i, (cap, nom, couleur) in enumerate(zip(capacites, noms, couleurs)):
-                if cap in df.columns:
-                    fig.add_trace(go.Scatter(
-                        x=df['Annee'], y=df[cap],
-                        mode='lines', name=nom,
-                        line=dict(color=couleur, width=4),
-                        hovertemplate=f"{nom}: %{{y:.1f}}%<extra></extra>"
-                    ))
+            if comparaison is None:
+                for i, (cap, nom, couleur) in enumerate(zip(capacites, noms, couleurs)):
+                    if cap in df.columns:
+                        fig.add_trace(line_trace(
+                            df['Annee'], df[cap],
+                            mode='lines', name=nom,
+                            line=dict(color=couleur, width=4),
+                            hovertemplate=f"{nom}: %{{y:.1f}}%<extra></extra>"
+                        ))
+            else:
+                # Une couleur par capacité, un style de trait par sélection
+                selections = list(dict.fromkeys(comparaison['Selection']))
+                for cap, nom, couleur in zip(capacites, noms, couleurs):
+                    for selection, tirets in zip(selections, COMPARAISON_TIRETS * len(selections)):
+                        serie = comparaison[(comparaison['Selection'] == selection) & (comparaison['Serie'] == cap)]
+                        if serie.empty:
+                            continue
+                        fig.add_trace(line_trace(
+                            serie['Annee'], serie['Valeur'],
+                            mode='lines', name=f"{nom} — {selection}",
+                            line=dict(color=couleur, width=3, dash=tirets),
+                            hovertemplate=f"{nom} ({selection}): %{{y:.1f}}%<extra></extra>"
+                        ))
             
             fig.update_layout(
-                title="📈 ÉVOLUTION DES CAPACITÉS DÉFENSIVES (2000-2027)",
+                title=f"📈 ÉVOLUTION DES CAPACITÉS DÉFENSIVES ({debut}-{fin})",
                 xaxis_title="Année",
                 yaxis_title="Niveau de Capacité (%)",
                 height=500,
                 template="plotly_white",
                 legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
             )
-            st.plotly_chart(fig, use_container_width=True)
+            return fig
         
-        with col2:
+        def build_programmes():
             # Analyse des programmes stratégiques
             strategic_data = []
             strategic_names = []
@@ -608,22 +783,134 @@ class DefenseJaponDashboardAvance:
                 strategic_data.append(df['Destroyers_AEGIS'])
                 strategic_names.append('Destroyers AEGIS')
             
-            if strategic_data:
-                fig = make_subplots(specs=[[{"secondary_y": True}]])
-                
-                for i, (data, nom) in enumerate(zip(strategic_data, strategic_names)):
-                    fig.add_trace(
-                        go.Scatter(x=df['Annee'], y=data, name=nom,
-                                 line=dict(width=4)),
-                        secondary_y=(i > 0)
-                    )
-                
-                fig.update_layout(
-                    title="🚀 PROGRAMMES STRATÉGIQUES - ÉVOLUTION COMPARÉE",
-                    height=500,
-                    template="plotly_white"
+            fig = make_subplots(specs=[[{"secondary_y": True}]])
+            
+            for i, (data, nom) in enumerate(zip(strategic_data, strategic_names)):
+                fig.add_trace(
+                    line_trace(df['Annee'], data, name=nom,
+                               line=dict(width=4)),
+                    secondary_y=(i > 0)
                 )
-                st.plotly_chart(fig, use_container_width=True)
+            
+            fig.update_layout(
+                title="🚀 PROGRAMMES STRATÉGIQUES - ÉVOLUTION COMPARÉE",
+                height=500,
+                template="plotly_white"
+            )
+            return fig
+        
+        # Graphiques principaux
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Évolution des capacités principales (superposition comparative jamais mise en cache)
+            cle = ('capacites', self.cle_donnees) if comparaison is None and self.cle_donnees else None
+            self.send_chart(*self.get_keyed_figure(cle, build_capacites))
+        
+        with col2:
+            if any(serie in df.columns for serie in ('Intercepteurs_BMD', 'Tests_Intercepteurs', 'Destroyers_AEGIS')):
+                cle = ('programmes', self.cle_donnees) if self.cle_donnees else None
+                self.send_chart(*self.get_keyed_figure(cle, build_programmes))
+        
+        if bandes is not None:
+            self.create_scenario_bands_chart(bandes, scenario, n_trajectoires)
+    
+    @fragment
+    def display_whatif_panel(self, selection, debut, fin, periodes_par_an):
+        """Panneau what-if: un curseur ne relance que ce fragment et ne renvoie que les séries affectées"""
+        with st.expander("🎚️ ANALYSE WHAT-IF", expanded=False):
+            config = self.get_advanced_config(selection)
+            ajustements = {}
+            for colonne, (cle, (libelle, minimum, maximum, pas)) in zip(
+                    st.columns(len(WHATIF_PARAMETRES)), WHATIF_PARAMETRES.items()):
+                defaut = type(minimum)(config.get(cle, SERIES_TABLE.cles_config[cle]))
+                with colonne:
+                    valeur = st.slider(libelle, minimum, maximum, defaut, pas, key=f"whatif_{selection}_{cle}")
+                if valeur != defaut:
+                    ajustements[cle] = valeur
+            
+            if not ajustements:
+                st.caption("Déplacez un curseur pour comparer les séries affectées à la référence.")
+                return
+            
+            chrono = time.perf_counter()
+            params = dict(debut=debut, fin=fin, periodes_par_an=periodes_par_an, compact=DATASET_COMPACT)
+            reference, _ = self.get_cached_data(selection, **params)
+            df, _ = self.get_cached_data(selection, ajustements=ajustements, **params)
+            series = [SERIES_TABLE.series[i] for i in SERIES_TABLE.invalidated(ajustements)
+                      if SERIES_TABLE.series[i] in df.columns]
+            
+            fig = make_subplots(rows=len(series), cols=1, shared_xaxes=True, subplot_titles=series)
+            for i, serie in enumerate(series):
+                fig.add_trace(line_trace(reference['Annee'], reference[serie], mode='lines',
+                                         name='Référence', showlegend=(i == 0),
+                                         line=dict(color='#2d3436', width=2, dash='dot')),
+                              row=i + 1, col=1)
+                fig.add_trace(line_trace(df['Annee'], df[serie], mode='lines',
+                                         name='What-if', showlegend=(i == 0),
+                                         line=dict(color='#BC002D', width=3)),
+                              row=i + 1, col=1)
+            latence = time.perf_counter() - chrono
+            WHATIF_SECONDS.observe(latence)
+            
+            fig.update_layout(height=250 * len(series), template="plotly_white")
+            self.render_chart(fig)
+            message = f"Recalcul what-if: {len(series)} série(s) en {latence * 1000:.1f} ms"
+            if latence * 1000 > WHATIF_LATENCY_BUDGET_MS:
+                st.warning(f"{message} (budget de {WHATIF_LATENCY_BUDGET_MS} ms dépassé)")
+            else:
+                st.caption(message)
+    
+    def create_scenario_bands_chart(self, bandes, scenario, n_trajectoires=None):
+        """Bandes P5/P50/P95 des trajectoires Monte Carlo du scénario, avec le nombre de trajectoires tirées"""
+        noms = {
+            'Budget_Defense_Mds': 'Budget Défense (Md$)',
+            'Readiness_Operative': 'Préparation Opér. (%)',
+            'Couverture_BMD': 'Couverture BMD (%)',
+            'Taux_Interception': "Taux d'Interception (%)"
+        }
+        def build_bandes():
+            fig = make_subplots(rows=2, cols=2, subplot_titles=[noms[serie] for serie in MONTE_CARLO_SERIES])
+            
+            for i, serie in enumerate(MONTE_CARLO_SERIES):
+                row, col = i // 2 + 1, i % 2 + 1
+                bande = bandes[bandes['Serie'] == serie]
+                # Indices communs aux trois traces: l'enveloppe P5-P95 garde ses extrêmes
+                indices = np.union1d(minmax_indices(bande['P5'], DISPLAY_MAX_POINTS // 2),
+                                     minmax_indices(bande['P95'], DISPLAY_MAX_POINTS // 2))
+                fig.add_trace(line_trace(bande['Annee'], bande['P95'], indices, mode='lines',
+                                         line=dict(width=0), showlegend=False, hoverinfo='skip'),
+                              row=row, col=col)
+                fig.add_trace(line_trace(bande['Annee'], bande['P5'], indices, mode='lines',
+                                         line=dict(width=0), fill='tonexty',
+                                         fillcolor='rgba(188, 0, 45, 0.2)',
+                                         name='P5-P95', showlegend=(i == 0),
+                                         customdata=bande['P95'],
+                                         hovertemplate="P5: %{y:.1f} • P95: %{customdata:.1f}<extra></extra>"),
+                              row=row, col=col)
+                fig.add_trace(line_trace(bande['Annee'], bande['P50'], indices, mode='lines',
+                                         line=dict(color='#BC002D', width=3),
+                                         name='Médiane (P50)', showlegend=(i == 0),
+                                         hovertemplate="P50: %{y:.1f}<extra></extra>"),
+                              row=row, col=col)
+            
+            fig.update_layout(
+                title=f"🎲 SCÉNARIO {scenario.upper()} - BANDES MONTE CARLO P5/P50/P95",
+                height=600,
+                template="plotly_white"
+            )
+            return fig
+        
+        cle = ('bandes', self.cle_donnees, scenario) if self.cle_donnees else None
+        self.send_chart(*self.get_keyed_figure(cle, build_bandes))
+        if n_trajectoires is not None:
+            message = f"Percentiles calculés sur {n_trajectoires:,} trajectoires".replace(',', ' ')
+            if n_trajectoires < MONTE_CARLO_TRAJECTOIRES:
+                # Borne mémoire de simulate_scenario_monte_carlo: horizon long ou résolution fine
+                st.warning(f"{message} au lieu de {MONTE_CARLO_TRAJECTOIRES:,}".replace(',', ' ')
+                           + " (borne mémoire atteinte pour cet horizon et cette résolution)")
+            else:
+                st.caption(message)
     
     def create_geopolitical_analysis(self, df, config):
         """Analyse géopolitique avancée"""
@@ -662,24 +949,30 @@ class DefenseJaponDashboardAvance:
                 'Événement': ['Essai TN-1', 'Essai TN-2', 'Tensions Senkaku', 'Essais multiples', 'Missile Hwasong', 'Essais records', 'Menaces accrues'],
                 'Niveau Menace': [6, 7, 5, 8, 8, 9, 9]  # sur 10
             }
-            menaces_df = pd.DataFrame(menaces_data)
+            layout = {'title': "📉 ÉVOLUTION DES MENACES RÉGIONALES", 'height': 400}
             
-            fig = px.bar(menaces_df, x='Année', y='Niveau Menace', 
-                        title="📉 ÉVOLUTION DES MENACES RÉGIONALES",
-                        labels={'Niveau Menace': 'Niveau de Menace'},
-                        color='Niveau Menace',
-                        color_continuous_scale='reds')
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            def build_menaces(data, layout):
+                fig = px.bar(pd.DataFrame(data), x='Année', y='Niveau Menace', 
+                            title=layout['title'],
+                            labels={'Niveau Menace': 'Niveau de Menace'},
+                            color='Niveau Menace',
+                            color_continuous_scale='reds')
+                fig.update_layout(height=layout['height'])
+                return fig
+            
+            self.send_chart(*self.get_cached_figure(menaces_data, layout, build_menaces))
             
             # Évolution de la posture défensive
-            posture = [min(70 + 2 * (annee - 2000), 90) for annee in df['Annee']]
-            fig = px.area(x=df['Annee'], y=posture,
-                         title="🛡️ ÉVOLUTION DE LA POSTURE DÉFENSIVE",
-                         labels={'x': 'Année', 'y': 'Niveau de Posture (%)'})
-            fig.update_traces(fillcolor='rgba(188, 0, 45, 0.3)', line_color='#BC002D')
-            fig.update_layout(height=300)
-            st.plotly_chart(fig, use_container_width=True)
+            def build_posture():
+                posture = np.minimum(70 + 2 * (df['Annee'].to_numpy() - 2000), 90)
+                fig = go.Figure(line_trace(df['Annee'], posture, mode='lines', fill='tozeroy',
+                                           fillcolor='rgba(188, 0, 45, 0.3)', line_color='#BC002D'))
+                fig.update_layout(title="🛡️ ÉVOLUTION DE LA POSTURE DÉFENSIVE",
+                                  xaxis_title='Année', yaxis_title='Niveau de Posture (%)', height=300)
+                return fig
+            
+            cle = ('posture', self.cle_donnees) if self.cle_donnees else None
+            self.send_chart(*self.get_keyed_figure(cle, build_posture))
     
     def create_technical_analysis(self, df, config):
         """Analyse technique détaillée"""
@@ -697,15 +990,18 @@ class DefenseJaponDashboardAvance:
                 'Année Service': [2018, 2018, 2020, 2022, 2020, 2000],
                 'Statut': ['Opérationnel', 'Opérationnel', 'Opérationnel', 'Opérationnel', 'Opérationnel', 'Modernisation']
             }
-            systems_df = pd.DataFrame(systems_data)
+            layout = {'title': "🎯 CARACTÉRISTIQUES DES SYSTÈMES D'ARMES", 'height': 500}
             
-            fig = px.scatter(systems_df, x='Portée (km)', y='Année Service', 
-                           size='Portée (km)', color='Statut',
-                           hover_name='Système', log_x=True,
-                           title="🎯 CARACTÉRISTIQUES DES SYSTÈMES D'ARMES",
-                           size_max=30)
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            def build_systems(data, layout):
+                fig = px.scatter(pd.DataFrame(data), x='Portée (km)', y='Année Service', 
+                               size='Portée (km)', color='Statut',
+                               hover_name='Système', log_x=True,
+                               title=layout['title'],
+                               size_max=30)
+                fig.update_layout(height=layout['height'])
+                return fig
+            
+            self.send_chart(*self.get_cached_figure(systems_data, layout, build_systems))
         
         with col2:
             # Analyse des capacités navales
@@ -714,17 +1010,19 @@ class DefenseJaponDashboardAvance:
                 '2000': [4, 20, 16, 40, 10],
                 '2027': [12, 25, 22, 55, 15]
             }
-            naval_df = pd.DataFrame(naval_data)
+            layout = {'title': "🚢 MODERNISATION DE LA FLOTTE NAVALE", 'barmode': 'group', 'height': 500}
             
-            fig = go.Figure()
-            fig.add_trace(go.Bar(name='2000', x=naval_df['Type Navire'], y=naval_df['2000'],
-                                marker_color='#1e3c72'))
-            fig.add_trace(go.Bar(name='2027', x=naval_df['Type Navire'], y=naval_df['2027'],
-                                marker_color='#BC002D'))
+            def build_naval(data, layout):
+                fig = go.Figure()
+                fig.add_trace(go.Bar(name='2000', x=data['Type Navire'], y=data['2000'],
+                                    marker_color='#1e3c72'))
+                fig.add_trace(go.Bar(name='2027', x=data['Type Navire'], y=data['2027'],
+                                    marker_color='#BC002D'))
+                
+                fig.update_layout(**layout)
+                return fig
             
-            fig.update_layout(title="🚢 MODERNISATION DE LA FLOTTE NAVALE",
-                             barmode='group', height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            self.send_chart(*self.get_cached_figure(naval_data, layout, build_naval))
             
             # Cartographie des installations
             st.markdown("""
@@ -808,14 +1106,17 @@ class DefenseJaponDashboardAvance:
                 'Impact': [0.8, 0.7, 0.6, 0.9, 0.9, 0.5],
                 'Niveau Préparation': [0.9, 0.8, 0.85, 0.7, 0.75, 0.6]
             }
-            threats_df = pd.DataFrame(threats_data)
+            layout = {'title': "🎯 MATRICE RISQUES - PROBABILITÉ VS IMPACT", 'height': 500}
+            
+            def build_threats(data, layout):
+                fig = px.scatter(pd.DataFrame(data), x='Probabilité', y='Impact', 
+                               size='Niveau Préparation', color='Type de Menace',
+                               title=layout['title'],
+                               size_max=30)
+                fig.update_layout(height=layout['height'])
+                return fig
             
-            fig = px.scatter(threats_df, x='Probabilité', y='Impact', 
-                           size='Niveau Préparation', color='Type de Menace',
-                           title="🎯 MATRICE RISQUES - PROBABILITÉ VS IMPACT",
-                           size_max=30)
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            self.send_chart(*self.get_cached_figure(threats_data, layout, build_threats))
         
         with col2:
             # Capacités de réponse
@@ -826,16 +1127,18 @@ class DefenseJaponDashboardAvance:
                 'Défense': [0.8, 0.8, 0.7, 0.8, 0.7],
                 'Contre-Attaque': [0.4, 0.7, 0.6, 0.5, 0.8]
             }
-            response_df = pd.DataFrame(response_data)
+            layout = {'title': "🛡️ CAPACITÉS DE RÉPONSE PAR SCÉNARIO", 'barmode': 'group', 'height': 500}
+            
+            def build_response(data, layout):
+                fig = go.Figure(data=[
+                    go.Bar(name='Interception', x=data['Scénario'], y=data['Interception']),
+                    go.Bar(name='Défense', x=data['Scénario'], y=data['Défense']),
+                    go.Bar(name='Contre-Attaque', x=data['Scénario'], y=data['Contre-Attaque'])
+                ])
+                fig.update_layout(**layout)
+                return fig
             
-            fig = go.Figure(data=[
-                go.Bar(name='Interception', x=response_df['Scénario'], y=response_df['Interception']),
-                go.Bar(name='Défense', x=response_df['Scénario'], y=response_df['Défense']),
-                go.Bar(name='Contre-Attaque', x=response_df['Scénario'], y=response_df['Contre-Attaque'])
-            ])
-            fig.update_layout(title="🛡️ CAPACITÉS DE RÉPONSE PAR SCÉNARIO",
-                             barmode='group', height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            self.send_chart(*self.get_cached_figure(response_data, layout, build_response))
         
         # Recommandations stratégiques
         st.markdown("""
@@ -868,19 +1171,22 @@ class DefenseJaponDashboardAvance:
                 'Classification': 'Défensif'
             })
         
-        defense_df = pd.DataFrame(defense_data)
-        
         # Affichage interactif
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            fig = px.scatter(defense_df, x='Portée (km)', y='Altitude (km)',
-                           size='Portée (km)', color='Type',
-                           hover_name='Système', log_x=True,
-                           title="🛡️ CARACTÉRISTIQUES DES SYSTÈMES DE DÉFENSE",
-                           size_max=30)
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            layout = {'title': "🛡️ CARACTÉRISTIQUES DES SYSTÈMES DE DÉFENSE", 'height': 500}
+            
+            def build_defense(data, layout):
+                fig = px.scatter(pd.DataFrame(data), x='Portée (km)', y='Altitude (km)',
+                               size='Portée (km)', color='Type',
+                               hover_name='Système', log_x=True,
+                               title=layout['title'],
+                               size_max=30)
+                fig.update_layout(height=layout['height'])
+                return fig
+            
+            self.send_chart(*self.get_cached_figure(defense_data, layout, build_defense))
         
         with col2:
             st.markdown("""
@@ -903,49 +1209,146 @@ class DefenseJaponDashboardAvance:
         """Exécute le dashboard avancé complet"""
         # Sidebar avancé
         controls = self.create_advanced_sidebar()
+        if controls['profilage']:
+            self.enable_profiling(Profiler())
         
         # Header avancé
-        self.display_advanced_header()
+        self.display_advanced_header(controls['debut'], controls['fin'])
         
         # Génération des données avancées
-        df, config = self.generate_advanced_data(controls['selection'])
-        
-        # Navigation par onglets avancés
-        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-            "📊 Tableau de Bord", 
-            "🔬 Analyse Technique", 
-            "🌍 Contexte Géopolitique", 
-            "📚 Doctrine Militaire",
-            "⚠️ Évaluation Menaces",
-            "🛡️ Systèmes Défensifs",
-            "💎 Synthèse Stratégique"
-        ])
-        
-        with tab1:
+        df, config = self.get_cached_data(
+            controls['selection'],
+            debut=controls['debut'],
+            fin=controls['fin'],
+            periodes_par_an=controls['periodes_par_an'],
+            compact=DATASET_COMPACT
+        )
+        
+        # Navigation par onglets avancés (seul l'onglet actif est calculé en mode paresseux)
+        sections = self.define_dashboard_sections(df, config, controls)
+        tabs = st.tabs(
+            [label for label, _ in sections],
+            key="onglet_actif",
+            on_change="rerun" if LAZY_TABS else "ignore"
+        )
+        
+        for tab, (label, render) in zip(tabs, sections):
+            with tab:
+                self.display_section(label, render, controls,
+                                     not LAZY_TABS or getattr(tab, 'open', None) is not False)
+        
+        if self.profiler is not None:
+            self.display_performance_panel()
+    
+    @fragment
+    def display_section(self, label, render, controls, ouvert):
+        """Onglet rendu en fragment: ses options du sidebar ne relancent que lui"""
+        for cle, (libelle, onglet) in OPTIONS_ONGLETS.items():
+            if onglet == label:
+                with self.options_sidebar[cle]:
+                    controls[cle] = st.checkbox(libelle, value=True, key=cle)
+        
+        # Onglet fermé en mode paresseux: seule sa case du sidebar est rendue
+        if not ouvert:
+            return
+        self.onglet_courant = label
+        with self.profile(label, 'onglet'):
+            render()
+    
+    def display_performance_panel(self):
+        """Panneau Performance du sidebar: durées par section, caches, payloads et trace JSON"""
+        with st.sidebar.expander("⚡ Performance", expanded=False):
+            st.markdown("**Durées par section**")
+            st.dataframe(pd.DataFrame(self.profiler.summary()).round(3), hide_index=True)
+            
+            # Compteurs cumulés du processus serveur (toutes sessions)
+            st.markdown("**Caches**")
+            st.dataframe(pd.DataFrame(
+                [{'cache': nom, 'entrées': stats['entries'], 'hits': stats['hits'], 'misses': stats['misses'],
+                  'taux': round(stats['hit_rate'], 3)}
+                 for nom, stats in self.cache_stats().items()]
+            ), hide_index=True)
+            
+            if self.profiler.payloads:
+                st.markdown("**Payload des figures**")
+                st.dataframe(pd.DataFrame(
+                    [{'figure': nom, 'octets': octets, 'économisés': self.profiler.economies.get(nom, 0)}
+                     for nom, octets in self.profiler.payloads.items()]
+                ), hide_index=True)
+            
+            st.download_button(
+                "📥 Trace JSON (format Chrome)",
+                json.dumps(self.profiler.to_chrome_trace(), ensure_ascii=False),
+                file_name="trace_dashboard.json",
+                mime="application/json"
+            )
+    
+    def define_dashboard_sections(self, df, config, controls):
+        """Onglets du dashboard et fonctions de rendu associées"""
+        self.cle_donnees = make_cache_key(
+            controls['selection'],
+            debut=controls['debut'],
+            fin=controls['fin'],
+            periodes_par_an=controls['periodes_par_an'],
+            compact=DATASET_COMPACT
+        )
+        
+        def tableau_de_bord():
+            bandes, n_trajectoires = self.get_cached_scenario_bands(
+                controls['selection'],
+                controls['scenario'],
+                debut=controls['debut'],
+                fin=controls['fin'],
+                periodes_par_an=controls['periodes_par_an'],
+                compact=DATASET_COMPACT
+            )
+            comparaison = None
+            if controls['comparaison']:
+                comparaison = self.get_cached_comparison(
+                    [controls['selection']] + controls['comparaison'],
+                    debut=controls['debut'],
+                    fin=controls['fin'],
+                    periodes_par_an=controls['periodes_par_an'],
+                    compact=DATASET_COMPACT
+                )
             self.display_strategic_metrics(df, config)
-            self.create_comprehensive_analysis(df, config)
+            self.create_comprehensive_analysis(df, config, bandes, controls['scenario'], comparaison,
+                                               n_trajectoires)
+            if controls['whatif']:
+                self.display_whatif_panel(controls['selection'], controls['debut'], controls['fin'],
+                                          controls['periodes_par_an'])
         
-        with tab2:
+        def analyse_technique():
             self.create_technical_analysis(df, config)
         
-        with tab3:
+        def contexte_geopolitique():
             if controls['show_geopolitical']:
                 self.create_geopolitical_analysis(df, config)
         
-        with tab4:
+        def doctrine_militaire():
             if controls['show_doctrinal']:
                 self.create_doctrinal_analysis(config)
         
-        with tab5:
+        def evaluation_menaces():
             if controls['threat_assessment']:
                 self.create_threat_assessment(df, config)
         
-        with tab6:
+        def systemes_defensifs():
             if controls['show_technical']:
                 self.create_defense_database()
         
-        with tab7:
+        def synthese_strategique():
             self.create_strategic_synthesis(df, config, controls)
+        
+        return [
+            ("📊 Tableau de Bord", tableau_de_bord),
+            ("🔬 Analyse Technique", analyse_technique),
+            ("🌍 Contexte Géopolitique", contexte_geopolitique),
+            ("📚 Doctrine Militaire", doctrine_militaire),
+            ("⚠️ Évaluation Menaces", evaluation_menaces),
+            ("🛡️ Systèmes Défensifs", systemes_defensifs),
+            ("💎 Synthèse Stratégique", synthese_strategique)
+        ]
     
     def create_strategic_synthesis(self, df, config, controls):
         """Synthèse stratégique finale"""
@@ -1048,7 +1451,26 @@ class DefenseJaponDashboardAvance:
         </div>
         """, unsafe_allow_html=True)
 
-# Lancement du dashboard avancé
+# Lancement du dashboard avancé (streamlit run) ou du mode headless (python -m simulation_japon)
 if __name__ == "__main__":
-    dashboard = DefenseJaponDashboardAvance()
-    dashboard.run_advanced_dashboard()
\ No newline at end of file
+    if st.runtime.exists():
+        chrono = time.perf_counter()
+        configure_page()
+        get_metrics_server()
+        if WARM_CACHES:
+            progression = get_cache_warmer().progress()
+            if progression:
+                st.sidebar.caption(progression)
+        METRICS.sessions.touch(get_script_run_ctx().session_id)
+        dashboard = DefenseJaponDashboardAvance(
+            dataset_cache=get_dataset_cache(),
+            figure_cache=get_figure_cache(),
+            store=get_shared_store(),
+            whatif_cache=get_whatif_cache()
+        )
+        try:
+            dashboard.run_advanced_dashboard()
+        finally:
+            RERUN_SECONDS.observe(time.perf_counter() - chrono)
+    else:
+        sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,180 @@
+# benchmarks.py
+# Suite de benchmarks: simulation, assemblage des DataFrames et construction des figures
+#
+#     python -m benchmarks --json bench.json
+#     python -m benchmarks --compare bench.json --threshold 0.25
+import argparse
+import contextlib
+import json
+import platform
+import statistics
+import sys
+import time
+from unittest import mock
+import numpy as np
+from simulation_japon import DefenseJaponSimulation, LRUCache, MONTE_CARLO_SEED, SERIES_TABLE
+
+# Tailles d'horizon (nombre de points) des benchmarks de séries individuelles
+HORIZON_SIZES = [28, 1_000, 100_000, 1_000_000]
+
+# Durée minimale cumulée d'une mesure, et nombre de mesures par benchmark
+MIN_ROUND_SECONDS = 0.05
+ROUNDS = 5
+
+# Seuil de régression par défaut (fraction de la médiane de référence)
+REGRESSION_THRESHOLD = 0.25
+
+class StreamlitStub:
+    """Remplace streamlit pendant les benchmarks: seules construction et sérialisation sont mesurées"""
+    def __init__(self):
+        self.sidebar = self
+    
+    def __getattr__(self, nom):
+        return lambda *args, **kwargs: None
+    
+    def columns(self, spec, **kwargs):
+        n_colonnes = spec if isinstance(spec, int) else len(spec)
+        return [contextlib.nullcontext() for _ in range(n_colonnes)]
+    
+    def plotly_chart(self, fig, **kwargs):
+        fig.to_json()
+
+def measure(fonction):
+    """Médiane et minimum (ms par appel) sur ROUNDS mesures calibrées"""
+    nombre = 1
+    while True:
+        debut = time.perf_counter()
+        for _ in range(nombre):
+            fonction()
+        duree = time.perf_counter() - debut
+        if duree >= MIN_ROUND_SECONDS:
+            break
+        nombre *= 10 if duree < MIN_ROUND_SECONDS / 10 else 2
+    
+    mesures = [duree / nombre]
+    for _ in range(ROUNDS - 1):
+        debut = time.perf_counter()
+        for _ in range(nombre):
+            fonction()
+        mesures.append((time.perf_counter() - debut) / nombre)
+    
+    return {
+        'median_ms': statistics.median(mesures) * 1000,
+        'min_ms': min(mesures) * 1000,
+        'calls_per_round': nombre,
+        'rounds': len(mesures)
+    }
+
+def generation_benchmarks():
+    """generate_advanced_data pour chaque branche et chaque programme"""
+    simulation = DefenseJaponSimulation()
+    for selection in simulation.branches_options + simulation.programmes_options:
+        yield f"generate_advanced_data[{selection}]", lambda s=selection: simulation.generate_advanced_data(s)
+
+def series_benchmarks(sizes=HORIZON_SIZES):
+    """Chaque série de la table, puis la table entière, sur des vecteurs d'années de taille croissante"""
+    simulation = DefenseJaponSimulation()
+    config = simulation.get_advanced_config("Forces d'Auto-Défense Japonaises")
+    for taille in sizes:
+        annees = np.linspace(2000, 2027, taille)
+        for serie in SERIES_TABLE.series:
+            yield f"simulate_series[{serie}, n={taille}]", lambda s=serie, a=annees: simulation.simulate_series([s], a, config)
+        yield f"simulate_all_series[n={taille}]", lambda a=annees: simulation.simulate_all_series(a, config)
+    
+    yield "simulate_scenario_monte_carlo[10000x28]", lambda: simulation.simulate_scenario_monte_carlo(
+        np.arange(2000, 2028), config, "Crise Taïwan", 10000, MONTE_CARLO_SEED)
+
+def figure_benchmarks():
+    """Chaque constructeur create_*, streamlit remplacé par StreamlitStub, caches désactivés"""
+    import Dashboard
+    
+    stub = StreamlitStub()
+    # Cache de taille nulle: chaque appel reconstruit et resérialise la figure
+    dashboard = Dashboard.DefenseJaponDashboardAvance(dataset_cache=LRUCache(0), figure_cache=LRUCache(0))
+    selection = "Forces d'Auto-Défense Japonaises"
+    df, config = dashboard.generate_advanced_data(selection)
+    bandes, n_trajectoires = dashboard.generate_scenario_bands(selection, "Crise Taïwan")
+    controls = {'selection': selection, 'scenario': "Crise Taïwan"}
+    
+    builders = {
+        'create_comprehensive_analysis': lambda: dashboard.create_comprehensive_analysis(
+            df, config, bandes, "Crise Taïwan", n_trajectoires=n_trajectoires),
+        'create_scenario_bands_chart': lambda: dashboard.create_scenario_bands_chart(bandes, "Crise Taïwan", n_trajectoires),
+        'create_geopolitical_analysis': lambda: dashboard.create_geopolitical_analysis(df, config),
+        'create_technical_analysis': lambda: dashboard.create_technical_analysis(df, config),
+        'create_doctrinal_analysis': lambda: dashboard.create_doctrinal_analysis(config),
+        'create_threat_assessment': lambda: dashboard.create_threat_assessment(df, config),
+        'create_defense_database': lambda: dashboard.create_defense_database(),
+        'create_strategic_synthesis': lambda: dashboard.create_strategic_synthesis(df, config, controls)
+    }
+    for nom, builder in builders.items():
+        def run(builder=builder):
+            with mock.patch.object(Dashboard, 'st', stub):
+                builder()
+        yield nom, run
+
+SUITES = {
+    'generation': generation_benchmarks,
+    'series': series_benchmarks,
+    'figures': figure_benchmarks
+}
+
+def run_benchmarks(suites=None, filtre=None):
+    """Exécute les suites demandées et retourne les résultats par benchmark"""
+    resultats = {}
+    for nom_suite in suites or SUITES:
+        for nom, fonction in SUITES[nom_suite]():
+            nom = f"{nom_suite}.{nom}"
+            if filtre and filtre not in nom:
+                continue
+            resultats[nom] = measure(fonction)
+            print(f"{nom}: {resultats[nom]['median_ms']:.3f} ms")
+    return resultats
+
+def compare(resultats, reference, threshold=REGRESSION_THRESHOLD):
+    """Liste des benchmarks dont la médiane dépasse la référence de plus de threshold"""
+    regressions = []
+    for nom, mesure in resultats.items():
+        if nom not in reference:
+            continue
+        reference_ms = reference[nom]['median_ms']
+        if mesure['median_ms'] > reference_ms * (1 + threshold):
+            regressions.append(f"{nom}: {mesure['median_ms']:.3f} ms > {reference_ms:.3f} ms (+{threshold:.0%})")
+    return regressions
+
+def main(argv=None):
+    """Point d'entrée: python -m benchmarks [--json ...] [--compare ...]"""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmarks de simulation, d'assemblage des DataFrames et de construction des figures"
+    )
+    parser.add_argument('--suite', action='append', choices=list(SUITES),
+                        help="Suite à exécuter (répétable, défaut: toutes)")
+    parser.add_argument('--filter', dest='filtre', help="N'exécute que les benchmarks contenant ce texte")
+    parser.add_argument('--json', help="Écrit les résultats en JSON dans ce fichier")
+    parser.add_argument('--compare', help="Fichier JSON de référence pour détecter les régressions")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+    
+    resultats = run_benchmarks(args.suite, args.filtre)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                            'numpy': np.__version__},
+                'results': resultats
+            }, f, ensure_ascii=False, indent=2)
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            reference = json.load(f)['results']
+        regressions = compare(resultats, reference, args.threshold)
+        for regression in regressions:
+            print(f"RÉGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
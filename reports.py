@@ -0,0 +1,257 @@
+# reports.py
+# Rapports statiques HTML (et PNG optionnels) pour chaque sélection et chaque scénario
+#
+#     python -m reports --out rapports/
+#     python -m reports --out rapports/ --workers 8 --png
+#     DEFENSE_JAPON_STORE_DIR=/srv/store python -m reports --warm
+import argparse
+import contextlib
+import html
+import importlib.util
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from unittest import mock
+from simulation_japon import (
+    DefenseJaponSimulation, LRUCache, SharedStore, HORIZON_DEBUT, HORIZON_FIN, RESOLUTIONS, SCENARIOS, slugify
+)
+
+# Fichier Plotly JS partagé par toutes les pages du rapport
+PLOTLY_JS = "plotly.min.js"
+
+# Cache de figures propre à chaque processus de travail: les figures statiques
+# (bases de données, doctrines) ne sont construites qu'une fois par processus
+FIGURE_CACHE = LRUCache(64)
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<title>{titre}</title>
+<script src="{plotly_js}"></script>
+{css}
+<style>
+body {{ font-family: sans-serif; max-width: 1400px; margin: auto; padding: 1rem; }}
+.colonne {{ display: inline-block; vertical-align: top; box-sizing: border-box; padding: 0 0.5rem; }}
+.metrique {{ display: inline-block; min-width: 12rem; margin: 0.5rem; }}
+.alerte {{ padding: 0.5rem 1rem; border-left: 4px solid #BC002D; background: #f8f9fa; }}
+</style>
+</head>
+<body>
+{contenu}
+</body>
+</html>
+"""
+
+class ReportRecorder:
+    """Remplace streamlit pendant le rendu: enregistre le HTML des éléments et les figures"""
+    def __init__(self):
+        self.sidebar = self
+        self.fragments = []
+        self.figures = []
+    
+    def __getattr__(self, nom):
+        return lambda *args, **kwargs: None
+    
+    @contextlib.contextmanager
+    def bloc(self, ouverture, fermeture):
+        self.fragments.append(ouverture)
+        yield
+        self.fragments.append(fermeture)
+    
+    def columns(self, spec, **kwargs):
+        largeurs = [1] * spec if isinstance(spec, int) else list(spec)
+        return [self.bloc(f'<div class="colonne" style="width: {100 * largeur / sum(largeurs):.2f}%">', '</div>')
+                for largeur in largeurs]
+    
+    def expander(self, label, **kwargs):
+        return self.bloc(f'<details><summary>{html.escape(label)}</summary>', '</details>')
+    
+    def markdown(self, texte, unsafe_allow_html=False, **kwargs):
+        self.fragments.append(texte if unsafe_allow_html else f'<p>{html.escape(texte)}</p>')
+    
+    def caption(self, texte, **kwargs):
+        self.fragments.append(f'<p><small>{html.escape(texte)}</small></p>')
+    
+    def info(self, texte, **kwargs):
+        self.fragments.append(f'<div class="alerte">{html.escape(texte)}</div>')
+    
+    warning = success = error = info
+    
+    def metric(self, label, value, delta=None, **kwargs):
+        delta = f'<br><em>{html.escape(str(delta))}</em>' if delta is not None else ''
+        self.fragments.append(f'<div class="metrique">{html.escape(label)}<br>'
+                              f'<strong>{html.escape(str(value))}</strong>{delta}</div>')
+    
+    def dataframe(self, data, **kwargs):
+        import pandas as pd
+        self.fragments.append(pd.DataFrame(data).to_html(index=False, border=0))
+    
+    def plotly_chart(self, fig, **kwargs):
+        # Converti en HTML seulement à l'écriture de la page (inutile au préchauffage)
+        self.figures.append(fig)
+        self.fragments.append(fig)
+    
+    def to_html(self):
+        return "\n".join(fragment if isinstance(fragment, str)
+                         else fragment.to_html(full_html=False, include_plotlyjs=False)
+                         for fragment in self.fragments)
+
+def render_sections(dashboard, selection, scenario, params, header=True):
+    """Rend toutes les sections d'une sélection x scénario, streamlit remplacé par un ReportRecorder"""
+    import Dashboard
+    
+    recorder = ReportRecorder()
+    with mock.patch.object(Dashboard, 'st', recorder):
+        if header:
+            dashboard.display_advanced_header(params['debut'], params['fin'])
+        df, config = dashboard.get_cached_data(selection, compact=Dashboard.DATASET_COMPACT, **params)
+        controls = Dashboard.offline_controls(selection, scenario, **params)
+        for label, render in dashboard.define_dashboard_sections(df, config, controls):
+            recorder.fragments.append(f'<h2>{html.escape(label)}</h2>')
+            render()
+    return recorder
+
+def render_report(task):
+    """Rend une page de rapport (sélection x scénario) dans un processus de travail"""
+    import Dashboard
+    
+    selection, scenario, out, params, png = task
+    dashboard = Dashboard.DefenseJaponDashboardAvance(dataset_cache=LRUCache(4), figure_cache=FIGURE_CACHE)
+    recorder = render_sections(dashboard, selection, scenario, params)
+    
+    dossier = os.path.join(out, slugify(selection))
+    os.makedirs(dossier, exist_ok=True)
+    chemin = os.path.join(dossier, f"{slugify(scenario)}.html")
+    with open(chemin, 'w', encoding='utf-8') as f:
+        f.write(PAGE_TEMPLATE.format(
+            titre=html.escape(f"{selection} — {scenario}"),
+            plotly_js=f"../{PLOTLY_JS}",
+            css=Dashboard.CUSTOM_CSS,
+            contenu=recorder.to_html()
+        ))
+    
+    if png:
+        for i, fig in enumerate(recorder.figures, start=1):
+            fig.write_image(os.path.join(dossier, f"{slugify(scenario)}_{i:02d}.png"))
+    
+    return selection, scenario, os.path.relpath(chemin, out)
+
+def warm_page(task):
+    """Calcule une sélection x scénario dans un processus de travail et l'écrit dans le magasin partagé"""
+    import Dashboard
+    
+    selection, scenario, params, store_args = task
+    dashboard = Dashboard.DefenseJaponDashboardAvance(
+        dataset_cache=LRUCache(4), figure_cache=FIGURE_CACHE, store=SharedStore(*store_args))
+    render_sections(dashboard, selection, scenario, params, header=False)
+    return selection, scenario
+
+def warm_store(store, selections, scenarios, max_workers=None, progress=None, mp_context=None, **params):
+    """Remplit le magasin partagé pour toutes les sélections x scénarios sur un pool de processus
+    
+    progress(selection, scenario, erreur) est appelé à chaque combinaison terminée.
+    Retourne la liste des combinaisons en échec.
+    """
+    params = {'debut': HORIZON_DEBUT, 'fin': HORIZON_FIN, 'periodes_par_an': 1, **params}
+    store_args = (store.repertoire, store.espace, store.version, store.max_bytes)
+    tasks = [(selection, scenario, params, store_args) for selection in selections for scenario in scenarios]
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    
+    echecs = []
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+        futures = {executor.submit(warm_page, task): task[:2] for task in tasks}
+        for future in as_completed(futures):
+            selection, scenario = futures[future]
+            erreur = future.exception()
+            if erreur is not None:
+                echecs.append(f"{selection} / {scenario}: {erreur!r}")
+            if progress is not None:
+                progress(selection, scenario, erreur)
+    return echecs
+
+def write_index(out, pages):
+    """Page d'accueil du rapport: une ligne par sélection, un lien par scénario"""
+    lignes = {}
+    for selection, scenario, chemin in pages:
+        lignes.setdefault(selection, []).append(f'<a href="{html.escape(chemin)}">{html.escape(scenario)}</a>')
+    contenu = "<h1>🗾 Rapports statiques - Défense Japon</h1><ul>" + "".join(
+        f"<li><strong>{html.escape(selection)}</strong>: {' • '.join(liens)}</li>"
+        for selection, liens in lignes.items()) + "</ul>"
+    with open(os.path.join(out, "index.html"), 'w', encoding='utf-8') as f:
+        f.write(PAGE_TEMPLATE.format(titre="Rapports Défense Japon", plotly_js=PLOTLY_JS, css="", contenu=contenu))
+
+def build_reports(out, selections=None, scenarios=None, max_workers=None, png=False, **params):
+    """Rend toutes les pages sélections x scénarios sur un pool de processus"""
+    import plotly.offline
+    
+    if png and importlib.util.find_spec('kaleido') is None:
+        raise RuntimeError("L'export PNG nécessite le paquet kaleido (pip install kaleido)")
+    if selections is None:
+        simulation = DefenseJaponSimulation()
+        selections = simulation.branches_options + simulation.programmes_options
+    if scenarios is None:
+        scenarios = list(SCENARIOS)
+    params = {'debut': HORIZON_DEBUT, 'fin': HORIZON_FIN, 'periodes_par_an': 1, **params}
+    
+    os.makedirs(out, exist_ok=True)
+    # Plotly JS écrit une seule fois, référencé par toutes les pages
+    with open(os.path.join(out, PLOTLY_JS), 'w', encoding='utf-8') as f:
+        f.write(plotly.offline.get_plotlyjs())
+    
+    tasks = [(selection, scenario, out, params, png) for selection in selections for scenario in scenarios]
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pages = list(executor.map(render_report, tasks))
+    
+    write_index(out, pages)
+    return pages
+
+def main(argv=None):
+    """Point d'entrée: python -m reports --out rapports/"""
+    parser = argparse.ArgumentParser(
+        prog="python -m reports",
+        description="Rapports HTML statiques (Plotly JS partagé) pour chaque sélection et chaque scénario"
+    )
+    parser.add_argument('--out', help="Répertoire de sortie")
+    parser.add_argument('--warm', action='store_true',
+                        help="Préchauffe le magasin partagé (DEFENSE_JAPON_STORE_DIR) au lieu d'écrire les pages")
+    parser.add_argument('--selection', action='append', help="Sélection à rendre (répétable, défaut: toutes)")
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                        help="Scénario à rendre (répétable, défaut: tous)")
+    parser.add_argument('--debut', type=int, default=HORIZON_DEBUT)
+    parser.add_argument('--fin', type=int, default=HORIZON_FIN)
+    parser.add_argument('--resolution', choices=list(RESOLUTIONS), default="Annuelle")
+    parser.add_argument('--workers', type=int, help="Nombre de processus (défaut: nombre de cœurs)")
+    parser.add_argument('--png', action='store_true', help="Exporte aussi chaque figure en PNG (kaleido)")
+    args = parser.parse_args(argv)
+    if not args.warm and not args.out:
+        parser.error("--out est requis (sauf avec --warm)")
+    params = {'debut': args.debut, 'fin': args.fin, 'periodes_par_an': RESOLUTIONS[args.resolution]}
+    
+    if args.warm:
+        import Dashboard
+        
+        store = Dashboard.open_shared_store()
+        if store is None:
+            print("Erreur: --warm nécessite DEFENSE_JAPON_STORE_DIR", file=sys.stderr)
+            return 1
+        simulation = DefenseJaponSimulation()
+        selections = args.selection or Dashboard.warm_selections(simulation)
+        echecs = warm_store(store, selections, args.scenario or list(SCENARIOS), args.workers, **params)
+        for echec in echecs:
+            print(f"ÉCHEC {echec}", file=sys.stderr)
+        print(f"Magasin préchauffé: {len(store)} entrée(s) dans {store.repertoire}")
+        return 1 if echecs else 0
+    
+    try:
+        pages = build_reports(args.out, args.selection, args.scenario, args.workers, args.png, **params)
+    except (RuntimeError, ValueError) as erreur:
+        print(f"Erreur: {erreur}", file=sys.stderr)
+        return 1
+    
+    print(f"{len(pages)} page(s) écrite(s) dans {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1567 @@
+# simulation_japon.py
+# Cœur de simulation sans dépendance UI: importable en headless (CLI, workers, cron)
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+import argparse
+import contextlib
+import functools
+import hashlib
+import importlib
+import json
+import logging
+import os
+import pickle
+import re
+import subprocess
+import sys
+import threading
+import time
+import unicodedata
+
+class LazyModule:
+    """Module importé à la première utilisation d'un de ses attributs"""
+    def __init__(self, nom):
+        self._nom = nom
+        self._module = None
+    
+    def __getattr__(self, attribut):
+        if self._module is None:
+            self._module = importlib.import_module(self._nom)
+        return getattr(self._module, attribut)
+
+# pandas n'est chargé qu'à la construction du premier DataFrame
+pd = LazyModule('pandas')
+
+# pyarrow (dépendance de streamlit) n'est chargé qu'à l'export ou au chargement columnaire
+pa = LazyModule('pyarrow')
+pa_ipc = LazyModule('pyarrow.ipc')
+pq = LazyModule('pyarrow.parquet')
+
+# Journal du module (serveur de métriques, chargement des exports)
+LOGGER = logging.getLogger(__name__)
+
+
+# Horizon de simulation par défaut (années incluses)
+HORIZON_DEBUT = 2000
+HORIZON_FIN = 2027
+
+# Résolutions temporelles disponibles (périodes par an)
+RESOLUTIONS = {"Annuelle": 1, "Mensuelle": 12, "Hebdomadaire": 52}
+
+# Nombre d'années simulées par bloc en génération par flux
+ANNEES_PAR_BLOC = 10
+
+# Modèle déclaratif des séries simulées, une ligne par série (t = année - 2000):
+#   valeur = echelle * (base + pente * t + paliers) * facteur + saison, bornée à [plancher, plafond]
+# - base / echelle / pente: constante, ou (clé de config, défaut)
+# - paliers: (année, saut, pente additionnelle) actifs à partir de l'année
+# - facteurs: (début, fin ou None, multiplicateur), le premier intervalle qui contient l'année l'emporte
+# - saison: (amplitude, période en années) d'un terme sinusoïdal
+# - priorite: série calculée seulement si la priorité figure dans la config
+# - entier: valeurs entières en résolution annuelle
+SERIES_MODELES = [
+    # Croissance modérée; post-9/11 et menaces nord-coréennes, tensions Senkaku, modernisation face à la Chine
+    {'serie': 'Budget_Defense_Mds', 'echelle': ('budget_base', 45.0), 'base': 1.0,
+     'pente': ('croissance_budget', 0.02),
+     'facteurs': [(2006, 2010, 1.05), (2012, 2015, 1.08), (2018, None, 1.12)]},
+    # Légère augmentation avec professionnalisation
+    {'serie': 'Personnel_Milliers', 'echelle': ('personnel_base', 250), 'base': 1.0,
+     'pente': ('croissance_personnel', 0.003)},
+    {'serie': 'PIB_Militaire_Pourcent', 'base': 0.9, 'pente': 0.05},
+    # Exercices avec coopération US, cycle biennal
+    {'serie': 'Exercices_Militaires', 'base': ('exercices_base', 60), 'pente': 3, 'saison': (8, 2)},
+    # Réformes post-9/11, modernisation, préparation accrue
+    {'serie': 'Readiness_Operative', 'base': 85, 'pente': 0.5,
+     'paliers': [(2006, 5, 0), (2014, 4, 0), (2020, 3, 0)], 'plafond': 96},
+    # Systèmes BMD, modernisation, contre-mesures avancées
+    {'serie': 'Capacite_Defense', 'base': 80, 'paliers': [(2007, 3, 0), (2015, 6, 0), (2021, 5, 0)],
+     'plafond': 94, 'entier': True},
+    {'serie': 'Temps_Reponse_Jours', 'base': 10, 'pente': -0.3, 'plancher': 3},
+    {'serie': 'Tests_Intercepteurs', 'base': 2, 'paliers': [(2006, 2, 1), (2012, -2, 1), (2018, -5, 1)],
+     'entier': True},
+    {'serie': 'Developpement_Technologique', 'base': 80, 'pente': 1.2, 'plafond': 95},
+    {'serie': 'Capacite_Anti_Access', 'base': 70, 'pente': 2.0, 'plafond': 92},
+    {'serie': 'Couverture_BMD', 'base': 60, 'pente': 3.0, 'plafond': 95},
+    {'serie': 'Resilience_Cyber', 'base': 75, 'pente': 2.2, 'plafond': 94},
+    {'serie': 'Capacites_ISR', 'base': 80, 'pente': 1.8, 'plafond': 96},
+    # Post-9/11, pivot vers l'Asie, coopération renforcée
+    {'serie': 'Cooperation_USA', 'base': 85, 'paliers': [(2001, 5, 0), (2012, 3, 0), (2017, 4, 0)],
+     'plafond': 98, 'entier': True},
+    {'serie': 'Intercepteurs_BMD', 'priorite': 'defense_missile', 'base': 10, 'pente': 2, 'plafond': 50,
+     'entier': True},
+    {'serie': 'Couverture_Radar', 'priorite': 'defense_missile', 'base': 70, 'pente': 2.5, 'plafond': 95},
+    {'serie': 'Taux_Interception', 'priorite': 'defense_missile', 'base': 75, 'pente': 1.5, 'plafond': 92},
+    {'serie': 'Navires_Combat', 'priorite': 'maritime', 'base': 120, 'pente': 3, 'plafond': 160, 'entier': True},
+    {'serie': 'Destroyers_AEGIS', 'priorite': 'maritime', 'base': 4,
+     'paliers': [(2007, 2, 0), (2012, 2, 0), (2018, 2, 1)], 'plafond': 15, 'entier': True},
+    {'serie': 'Sous_Marins', 'priorite': 'maritime', 'base': 16, 'pente': 0.5, 'plafond': 24},
+    {'serie': 'Satellites_Militaires', 'priorite': 'aerospatial', 'base': 5, 'pente': 1.5, 'plafond': 20},
+    {'serie': 'Capacite_Antisatellite', 'priorite': 'aerospatial', 'base': 40, 'pente': 2.5, 'plafond': 85},
+    {'serie': 'Avions_Combat', 'priorite': 'aerospatial', 'base': 250, 'pente': 5, 'plafond': 350,
+     'entier': True},
+    {'serie': 'Cyber_Defense_Niveau', 'priorite': 'cyber', 'base': 80, 'pente': 1.8, 'plafond': 95},
+    {'serie': 'Reseau_Commandement_Cyber', 'priorite': 'cyber', 'base': 75, 'pente': 2.0, 'plafond': 93},
+    {'serie': 'Incidents_Cyber_Controles', 'priorite': 'cyber', 'base': 85, 'pente': 1.0, 'plafond': 97}
+]
+
+# Scénarios géopolitiques du moteur Monte Carlo: année de déclenchement du choc,
+# volatilité annuelle relative et chocs relatifs (moyenne, écart-type) par série
+SCENARIOS = {
+    "Statut Quo": {
+        "annee_choc": None,
+        "volatilite": 0.01,
+        "chocs": {}
+    },
+    "Crise Taïwan": {
+        "annee_choc": 2025,
+        "volatilite": 0.02,
+        "chocs": {
+            'Budget_Defense_Mds': (0.15, 0.05),
+            'Readiness_Operative': (0.03, 0.02),
+            'Couverture_BMD': (-0.05, 0.03),
+            'Taux_Interception': (-0.08, 0.04)
+        }
+    },
+    "Attaque Nord-Coréenne": {
+        "annee_choc": 2024,
+        "volatilite": 0.025,
+        "chocs": {
+            'Budget_Defense_Mds': (0.10, 0.04),
+            'Readiness_Operative': (0.05, 0.02),
+            'Couverture_BMD': (-0.10, 0.05),
+            'Taux_Interception': (-0.15, 0.06)
+        }
+    },
+    "Conflit Territorial": {
+        "annee_choc": 2023,
+        "volatilite": 0.015,
+        "chocs": {
+            'Budget_Defense_Mds': (0.08, 0.03),
+            'Readiness_Operative': (0.02, 0.01),
+            'Couverture_BMD': (-0.02, 0.02),
+            'Taux_Interception': (-0.03, 0.02)
+        }
+    }
+}
+
+# Séries perturbées par le moteur Monte Carlo (les pourcentages sont bornés à [0, 100])
+MONTE_CARLO_SERIES = ['Budget_Defense_Mds', 'Readiness_Operative', 'Couverture_BMD', 'Taux_Interception']
+MONTE_CARLO_POURCENTAGES = {'Readiness_Operative', 'Couverture_BMD', 'Taux_Interception'}
+
+# Paramètres par défaut des tirages Monte Carlo
+MONTE_CARLO_TRAJECTOIRES = 10000
+MONTE_CARLO_SEED = 42
+MONTE_CARLO_PERCENTILES = (5, 50, 95)
+
+# Nombre maximal de valeurs tirées par série (trajectoires x périodes), borne mémoire
+MONTE_CARLO_MAX_ELEMENTS = 5_000_000
+
+# Mode typé compact: colonnes de libellés converties en catégories
+COLONNES_CATEGORIELLES = ['Selection', 'Scenario', 'Serie']
+# Colonnes décimales hors séries (format long, percentiles Monte Carlo) compactées en float32
+COLONNES_DECIMALES = ['Valeur'] + [f'P{p}' for p in MONTE_CARLO_PERCENTILES]
+
+# Nombre maximal de jeux de données conservés en cache (éviction LRU)
+DATASET_CACHE_MAX_ENTRIES = 128
+
+# Variantes what-if conservées à part: elles n'évincent pas les jeux de données de référence
+WHATIF_CACHE_MAX_ENTRIES = 16
+
+# Magasin partagé sur disque entre processus (SQLite), actif si le répertoire est défini
+STORE_DIR = os.environ.get('DEFENSE_JAPON_STORE_DIR')
+STORE_MAX_BYTES = int(os.environ.get('DEFENSE_JAPON_STORE_MAX_BYTES', 512 * 1024 * 1024))
+# Dates d'accès des lectures écrites par lot au plus toutes les N secondes (et avant chaque éviction)
+STORE_ACCESS_FLUSH_SECONDS = 5.0
+
+# Répertoire des exports columnaires relus par le dashboard (désactivé si non défini)
+DATA_DIR = os.environ.get('DEFENSE_JAPON_DATA_DIR')
+
+# Version du schéma des exports columnaires: schéma Arrow fixe par colonne (export_schema),
+# identique pour toutes les résolutions et plages de valeurs (à incrémenter si cela change)
+EXPORT_SCHEMA_VERSION = 3
+
+# Port du serveur de métriques Prometheus, sur localhost (désactivé si non défini). Une plage
+# '9464-9471' donne un port par processus serveur: chacun prend le premier port libre
+METRICS_PORT = os.environ.get('DEFENSE_JAPON_METRICS_PORT')
+
+# Bornes (secondes) des histogrammes de latence
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Délai (secondes) au-delà duquel une session sans rerun n'est plus comptée active
+SESSION_TIMEOUT = 300
+
+# Préchauffage des caches au démarrage du serveur (désactivé par DEFENSE_JAPON_WARM=0),
+# repris toutes les DEFENSE_JAPON_WARM_INTERVAL secondes si défini
+WARM_CACHES = os.environ.get('DEFENSE_JAPON_WARM', '1') != '0'
+WARM_INTERVAL = float(os.environ.get('DEFENSE_JAPON_WARM_INTERVAL', 0)) or None
+# Processus de travail du préchauffage (hors du processus serveur qui sert les sessions)
+WARM_WORKERS = int(os.environ.get('DEFENSE_JAPON_WARM_WORKERS', 2))
+
+# Budgets de temps d'import (ms, interpréteur neuf) vérifiés par `check-import`
+IMPORT_TIME_BUDGET_MS = {'simulation_japon': 250, 'Dashboard': 1000}
+
+# Modules lourds que le cœur de simulation ne doit pas charger à l'import
+MODULES_UI = ['streamlit', 'plotly', 'pandas', 'matplotlib', 'seaborn']
+
+class InFlight:
+    """Calcul en cours partagé par les requêtes concurrentes d'une même clé"""
+    def __init__(self):
+        self.termine = threading.Event()
+        self.valeur = None
+        self.erreur = None
+    
+    def wait(self):
+        self.termine.wait()
+        if self.erreur is not None:
+            raise self.erreur
+        return self.valeur
+
+class LRUCache:
+    """Cache borné à éviction LRU, partagé entre les sessions
+    
+    get_or_compute regroupe les requêtes concurrentes d'une même clé (single-flight):
+    un seul calcul est lancé, les autres requêtes attendent son résultat sans tenir
+    le verrou du cache. Un calcul en échec n'est pas mis en cache.
+    """
+    def __init__(self, max_entries=DATASET_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()
+        self._en_cours = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def __contains__(self, key):
+        return key in self._entries
+    
+    def get(self, key, default=None):
+        """Retourne l'entrée et la marque comme la plus récemment utilisée"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+    
+    def put(self, key, value):
+        """Ajoute une entrée et évince la moins récemment utilisée si besoin"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def get_or_compute(self, key, compute):
+        """Retourne l'entrée en cache, attend le calcul en cours de la même clé, ou la calcule"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            vol = self._en_cours.get(key)
+            if vol is None:
+                vol = self._en_cours[key] = InFlight()
+                self.misses += 1
+                meneur = True
+            else:
+                self.coalesced += 1
+                meneur = False
+        
+        if not meneur:
+            return vol.wait()
+        
+        try:
+            value = compute()
+        except BaseException as erreur:
+            # Les requêtes en attente reçoivent l'erreur, les suivantes relancent le calcul
+            with self._lock:
+                del self._en_cours[key]
+            vol.erreur = erreur
+            vol.termine.set()
+            raise
+        
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            del self._en_cours[key]
+        vol.valeur = value
+        vol.termine.set()
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.coalesced = 0
+    
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+class SharedStore:
+    """Magasin clé-valeur SQLite partagé entre processus, borné en taille et versionné par le code
+    
+    Chaque espace (application) ne voit que les entrées de sa version de code: celles
+    d'une autre version sont supprimées à l'ouverture. Les écritures et l'éviction des
+    entrées les moins récemment lues se font dans une même transaction. Une lecture
+    n'écrit pas: les dates d'accès sont reportées par lot, pour que les sessions ne
+    se sérialisent pas sur le verrou d'écriture SQLite.
+    """
+    def __init__(self, repertoire, espace, version, max_bytes=STORE_MAX_BYTES,
+                 flush_seconds=STORE_ACCESS_FLUSH_SECONDS):
+        import sqlite3
+        
+        os.makedirs(repertoire, exist_ok=True)
+        self.repertoire = repertoire
+        self.chemin = os.path.join(repertoire, 'defense_japon_store.sqlite')
+        self.espace = espace
+        self.version = version
+        self.max_bytes = max_bytes
+        self.flush_seconds = flush_seconds
+        self.hits = 0
+        self.misses = 0
+        self._acces = {}
+        self._dernier_report = time.monotonic()
+        self._lock = threading.Lock()
+        self._connexion = sqlite3.connect(self.chemin, timeout=30, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._connexion.execute("PRAGMA journal_mode=WAL")
+            self._connexion.execute(
+                "CREATE TABLE IF NOT EXISTS entrees (espace TEXT, cle TEXT, version TEXT, valeur BLOB, "
+                "taille INTEGER, acces REAL, PRIMARY KEY (espace, cle))")
+            self._connexion.execute("CREATE INDEX IF NOT EXISTS entrees_acces ON entrees (acces)")
+            # Entrées calculées par une autre version du code: périmées
+            self._connexion.execute("DELETE FROM entrees WHERE espace = ? AND version != ?", (espace, version))
+    
+    def __len__(self):
+        with self._lock:
+            return self._connexion.execute(
+                "SELECT COUNT(*) FROM entrees WHERE espace = ?", (self.espace,)).fetchone()[0]
+    
+    def key_id(self, key):
+        """Identifiant stable d'une clé de cache (tuples de chaînes et de nombres)"""
+        return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+    
+    def flush_access(self):
+        """Écrit en un lot les dates d'accès des lectures en attente (verrou du magasin tenu)"""
+        if self._acces:
+            self._connexion.executemany("UPDATE entrees SET acces = ? WHERE espace = ? AND cle = ?",
+                                        [(acces, self.espace, cle) for cle, acces in self._acces.items()])
+            self._acces.clear()
+        self._dernier_report = time.monotonic()
+    
+    def get(self, key, default=None):
+        """Retourne l'entrée; sa date d'accès est reportée au prochain lot"""
+        cle = self.key_id(key)
+        with self._lock:
+            ligne = self._connexion.execute(
+                "SELECT valeur FROM entrees WHERE espace = ? AND cle = ? AND version = ?",
+                (self.espace, cle, self.version)).fetchone()
+            if ligne is not None:
+                self._acces[cle] = time.time()
+                if time.monotonic() - self._dernier_report >= self.flush_seconds:
+                    self.flush_access()
+        if ligne is None:
+            self.misses += 1
+            return default
+        try:
+            valeur = pickle.loads(ligne[0])
+        except Exception:
+            # Entrée illisible (écrite par une version incompatible de pandas ou numpy)
+            self.misses += 1
+            return default
+        self.hits += 1
+        return valeur
+    
+    def put(self, key, value):
+        """Écrit l'entrée puis évince les moins récemment lues au-delà de max_bytes"""
+        valeur = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(valeur) > self.max_bytes:
+            return
+        with self._lock:
+            self._connexion.execute("BEGIN IMMEDIATE")
+            try:
+                # Dates d'accès à jour avant l'éviction des entrées les moins récemment lues
+                self.flush_access()
+                self._connexion.execute(
+                    "INSERT OR REPLACE INTO entrees VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.espace, self.key_id(key), self.version, valeur, len(valeur), time.time()))
+                total = self._connexion.execute("SELECT COALESCE(SUM(taille), 0) FROM entrees").fetchone()[0]
+                if total > self.max_bytes:
+                    evincees = []
+                    for espace, cle, taille in self._connexion.execute(
+                            "SELECT espace, cle, taille FROM entrees ORDER BY acces"):
+                        if total <= self.max_bytes:
+                            break
+                        evincees.append((espace, cle))
+                        total -= taille
+                    self._connexion.executemany("DELETE FROM entrees WHERE espace = ? AND cle = ?", evincees)
+                self._connexion.execute("COMMIT")
+            except BaseException:
+                self._connexion.execute("ROLLBACK")
+                raise
+    
+    def get_or_compute(self, key, compute):
+        """Retourne l'entrée du magasin ou la calcule puis l'écrit"""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._connexion.execute("DELETE FROM entrees WHERE espace = ?", (self.espace,))
+            self._acces.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self):
+        with self._lock:
+            entrees, octets = self._connexion.execute(
+                "SELECT COUNT(*), COALESCE(SUM(taille), 0) FROM entrees WHERE espace = ?", (self.espace,)).fetchone()
+        total = self.hits + self.misses
+        return {
+            'entries': entrees,
+            'bytes': octets,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+class Profiler:
+    """Chronométrage haute résolution des sections, exportable au format Chrome trace-event"""
+    def __init__(self):
+        self.origine_ns = time.perf_counter_ns()
+        self.events = []
+        self.payloads = {}
+        self.economies = {}
+        self._lock = threading.Lock()
+    
+    @contextlib.contextmanager
+    def section(self, nom, categorie='section', **args):
+        """Chronomètre le bloc et l'enregistre comme événement complet ('X')"""
+        debut_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add_event(nom, categorie, debut_ns, time.perf_counter_ns(), args)
+    
+    def wrap(self, fonction, nom, categorie):
+        """Enveloppe une fonction pour chronométrer chacun de ses appels"""
+        @functools.wraps(fonction)
+        def chronometree(*args, **kwargs):
+            with self.section(nom, categorie):
+                return fonction(*args, **kwargs)
+        return chronometree
+    
+    def add_event(self, nom, categorie, debut_ns, fin_ns, args=None):
+        event = {
+            'name': nom,
+            'cat': categorie,
+            'ph': 'X',
+            'ts': (debut_ns - self.origine_ns) / 1000,
+            'dur': (fin_ns - debut_ns) / 1000,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args or {}
+        }
+        with self._lock:
+            self.events.append(event)
+    
+    def record_payload(self, nom, octets, economises=0):
+        """Enregistre la taille d'une figure envoyée au navigateur et les octets économisés (compteur 'C')"""
+        with self._lock:
+            self.payloads[nom] = self.payloads.get(nom, 0) + octets
+            self.economies[nom] = self.economies.get(nom, 0) + economises
+            self.events.append({
+                'name': 'payload_octets',
+                'cat': 'payload',
+                'ph': 'C',
+                'ts': (time.perf_counter_ns() - self.origine_ns) / 1000,
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+                'args': {nom: octets}
+            })
+    
+    def summary(self):
+        """Durées agrégées par section, de la plus coûteuse à la moins coûteuse"""
+        agregats = {}
+        for event in self.events:
+            if event['ph'] != 'X':
+                continue
+            agregat = agregats.setdefault((event['cat'], event['name']), {
+                'categorie': event['cat'], 'section': event['name'], 'appels': 0, 'total_ms': 0.0, 'max_ms': 0.0
+            })
+            agregat['appels'] += 1
+            agregat['total_ms'] += event['dur'] / 1000
+            agregat['max_ms'] = max(agregat['max_ms'], event['dur'] / 1000)
+        return sorted(agregats.values(), key=lambda agregat: agregat['total_ms'], reverse=True)
+    
+    def to_chrome_trace(self):
+        """Trace JSON lisible par chrome://tracing et Perfetto"""
+        return {
+            'traceEvents': list(self.events),
+            'displayTimeUnit': 'ms',
+            'otherData': {'payload_octets': dict(self.payloads), 'octets_economises': dict(self.economies)}
+        }
+
+def escape_label_value(valeur):
+    """Échappe une valeur de label (antislash, guillemet, saut de ligne)"""
+    return str(valeur).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(labels):
+    """Labels au format d'exposition Prometheus: {nom="valeur",...}"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{nom}="{escape_label_value(valeur)}"' for nom, valeur in labels) + '}'
+
+class Counter:
+    """Compteur monotone, une valeur par combinaison de labels"""
+    type_metrique = 'counter'
+    
+    def __init__(self, nom, aide):
+        self.nom = nom
+        self.aide = aide
+        self._valeurs = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, valeur=1, **labels):
+        cle = tuple(sorted(labels.items()))
+        with self._lock:
+            self._valeurs[cle] = self._valeurs.get(cle, 0) + valeur
+    
+    def samples(self):
+        with self._lock:
+            return [(self.nom, cle, valeur) for cle, valeur in self._valeurs.items()]
+
+class Gauge(Counter):
+    """Valeur instantanée, une valeur par combinaison de labels"""
+    type_metrique = 'gauge'
+    
+    def set(self, valeur, **labels):
+        with self._lock:
+            self._valeurs[tuple(sorted(labels.items()))] = valeur
+
+class Histogram:
+    """Histogramme à bornes fixes (buckets cumulés, somme et nombre d'observations)"""
+    type_metrique = 'histogram'
+    
+    def __init__(self, nom, aide, buckets=LATENCY_BUCKETS):
+        self.nom = nom
+        self.aide = aide
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, valeur, **labels):
+        cle = tuple(sorted(labels.items()))
+        with self._lock:
+            serie = self._series.setdefault(cle, {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for i, borne in enumerate(self.buckets):
+                if valeur <= borne:
+                    serie['buckets'][i] += 1
+            serie['sum'] += valeur
+            serie['count'] += 1
+    
+    def samples(self):
+        resultats = []
+        with self._lock:
+            for cle, serie in self._series.items():
+                for borne, nombre in zip(self.buckets, serie['buckets']):
+                    resultats.append((f"{self.nom}_bucket", cle + (('le', repr(float(borne))),), nombre))
+                resultats.append((f"{self.nom}_bucket", cle + (('le', '+Inf'),), serie['count']))
+                resultats.append((f"{self.nom}_sum", cle, serie['sum']))
+                resultats.append((f"{self.nom}_count", cle, serie['count']))
+        return resultats
+
+class SessionTracker:
+    """Sessions actives: vues lors d'un rerun dans les SESSION_TIMEOUT dernières secondes"""
+    def __init__(self, timeout=SESSION_TIMEOUT):
+        self.timeout = timeout
+        self._derniere_activite = {}
+        self._lock = threading.Lock()
+    
+    def touch(self, session_id):
+        with self._lock:
+            self._derniere_activite[session_id] = time.monotonic()
+    
+    def active_count(self):
+        limite = time.monotonic() - self.timeout
+        with self._lock:
+            for session_id in [s for s, vu in self._derniere_activite.items() if vu < limite]:
+                del self._derniere_activite[session_id]
+            return len(self._derniere_activite)
+
+class MetricsRegistry:
+    """Registre de métriques rendu au format texte d'exposition Prometheus (0.0.4)"""
+    def __init__(self):
+        self.metriques = []
+        self.caches = {}
+        self.sessions = SessionTracker()
+    
+    def register(self, metrique):
+        self.metriques.append(metrique)
+        return metrique
+    
+    def register_cache(self, nom, cache):
+        """Expose les compteurs hit/miss d'un LRUCache au moment de la collecte"""
+        self.caches[nom] = cache
+    
+    def collect_caches(self):
+        hits = Counter('defense_japon_cache_hits_total', "Accès cache réussis")
+        misses = Counter('defense_japon_cache_misses_total', "Accès cache manqués")
+        ratio = Gauge('defense_japon_cache_hit_ratio', "Taux de réussite du cache")
+        entrees = Gauge('defense_japon_cache_entries', "Entrées présentes dans le cache")
+        regroupes = Counter('defense_japon_cache_coalesced_total', "Requêtes ayant attendu un calcul déjà en cours")
+        for nom, cache in self.caches.items():
+            stats = cache.stats()
+            hits.inc(stats['hits'], cache=nom)
+            misses.inc(stats['misses'], cache=nom)
+            ratio.set(stats['hit_rate'], cache=nom)
+            entrees.set(stats['entries'], cache=nom)
+            if 'coalesced' in stats:
+                regroupes.inc(stats['coalesced'], cache=nom)
+        return [hits, misses, ratio, entrees, regroupes]
+    
+    def render(self):
+        sessions = Gauge('defense_japon_active_sessions', "Sessions ayant relancé le script récemment")
+        sessions.set(self.sessions.active_count())
+        lignes = []
+        for metrique in self.metriques + self.collect_caches() + [sessions]:
+            lignes.append(f"# HELP {metrique.nom} {metrique.aide}")
+            lignes.append(f"# TYPE {metrique.nom} {metrique.type_metrique}")
+            for nom, labels, valeur in metrique.samples():
+                lignes.append(f"{nom}{format_labels(labels)} {valeur}")
+        return '\n'.join(lignes) + '\n'
+
+def parse_port_range(valeur):
+    """'9464' ou '9464-9471' -> ports à essayer dans l'ordre (ValueError si la plage est invalide)"""
+    debut, tiret, fin = str(valeur).strip().partition('-')
+    try:
+        debut, fin = int(debut), int(fin if tiret else debut)
+    except ValueError:
+        raise ValueError(f"Plage de ports invalide: {valeur!r} (attendu '9464' ou '9464-9471')") from None
+    if not 0 < debut <= fin <= 65535:
+        raise ValueError(f"Plage de ports invalide: {valeur!r} (début <= fin, entre 1 et 65535)")
+    return range(debut, fin + 1)
+
+def start_metrics_server(registry, ports, host='127.0.0.1'):
+    """Sert /metrics depuis un thread démon sur le premier port libre (None si aucun ne l'est)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            corps = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(corps)))
+            self.end_headers()
+            self.wfile.write(corps)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    if isinstance(ports, int):
+        ports = [ports]
+    derniere_erreur = None
+    for port in ports:
+        try:
+            serveur = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as erreur:
+            # Port déjà pris (autre processus serveur): essaie le suivant
+            derniere_erreur = erreur
+            continue
+        threading.Thread(target=serveur.serve_forever, name='defense-japon-metrics', daemon=True).start()
+        LOGGER.info("Métriques servies sur http://%s:%d/metrics", host, port)
+        return serveur
+    LOGGER.warning("Serveur de métriques non démarré (ports %s): %s", list(ports), derniere_erreur)
+    return None
+
+# Registre global du processus, partagé par toutes les sessions
+METRICS = MetricsRegistry()
+RERUN_SECONDS = METRICS.register(Histogram(
+    'defense_japon_rerun_seconds', "Durée d'un rerun complet du dashboard"))
+GENERATE_SECONDS = METRICS.register(Histogram(
+    'defense_japon_generate_seconds', "Durée de generate_advanced_data"))
+FIGURE_BYTES = METRICS.register(Counter(
+    'defense_japon_figure_bytes_total', "Octets de figures Plotly envoyés, par onglet"))
+FIGURE_BYTES_SAVED = METRICS.register(Counter(
+    'defense_japon_figure_bytes_saved_total', "Octets économisés par l'allègement des figures Plotly, par onglet"))
+WHATIF_SECONDS = METRICS.register(Histogram(
+    'defense_japon_whatif_seconds', "Latence d'un recalcul what-if (changement de curseur -> données du graphique)"))
+WARMUP_PROGRESS = METRICS.register(Gauge(
+    'defense_japon_warmup_progress_ratio', "Avancement du préchauffage des caches (0 à 1)"))
+WARMUP_SECONDS = METRICS.register(Gauge(
+    'defense_japon_warmup_seconds', "Durée de la dernière passe complète de préchauffage"))
+
+def make_cache_key(selection, **params):
+    """Clé de cache stable pour une sélection et ses paramètres de simulation"""
+    return (selection, tuple(sorted(params.items())))
+
+def source_version(*chemins):
+    """Version du code: empreinte SHA-256 des fichiers source donnés"""
+    empreinte = hashlib.sha256()
+    for chemin in chemins:
+        with open(chemin, 'rb') as f:
+            empreinte.update(f.read())
+    return empreinte.hexdigest()[:16]
+
+@functools.lru_cache(maxsize=None)
+def model_version():
+    """Version du modèle de simulation (séries, configs, Monte Carlo): empreinte de ce module"""
+    return source_version(os.path.abspath(__file__))
+
+def content_hash(*parts):
+    """Empreinte SHA-256 stable du contenu (données d'entrée, options de mise en page)"""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def build_time_axis(debut=HORIZON_DEBUT, fin=HORIZON_FIN, periodes_par_an=1):
+    """Vecteur temporel en années décimales (entiers en résolution annuelle)"""
+    if fin < debut:
+        raise ValueError(f"Horizon invalide: fin ({fin}) antérieure au début ({debut})")
+    if periodes_par_an < 1:
+        raise ValueError(f"Résolution invalide: {periodes_par_an} période(s) par an")
+    if periodes_par_an == 1:
+        return np.arange(debut, fin + 1)
+    n_periodes = (fin - debut + 1) * periodes_par_an
+    return debut + np.arange(n_periodes) / periodes_par_an
+
+def monte_carlo_trajectories(n_trajectoires, n_periodes):
+    """Nombre de trajectoires effectivement tirées: borné à MONTE_CARLO_MAX_ELEMENTS valeurs par série"""
+    return max(1, min(n_trajectoires, MONTE_CARLO_MAX_ELEMENTS // max(n_periodes, 1)))
+
+def freeze_dataframe(data):
+    """Construit un DataFrame en lecture seule à partir d'un dict de séries"""
+    frozen = {}
+    for colonne, valeurs in data.items():
+        if isinstance(getattr(valeurs, 'dtype', None), pd.CategoricalDtype):
+            # Les catégories restent partagées, seuls les codes sont figés
+            codes = np.asarray(valeurs.cat.codes).view()
+            codes.setflags(write=False)
+            frozen[colonne] = pd.Categorical.from_codes(codes, dtype=valeurs.dtype)
+            continue
+        # Vue sans copie: les tableaux mappés en mémoire restent partagés
+        valeurs = np.asarray(valeurs).view()
+        valeurs.setflags(write=False)
+        frozen[colonne] = valeurs
+    return pd.DataFrame(frozen, copy=False)
+
+def freeze_config(config):
+    """Config en lecture seule: listes en tuples, dicts en MappingProxyType, à toute profondeur"""
+    if isinstance(config, (dict, MappingProxyType)):
+        return MappingProxyType({cle: freeze_config(valeur) for cle, valeur in config.items()})
+    if isinstance(config, (list, tuple)):
+        return tuple(freeze_config(valeur) for valeur in config)
+    return config
+
+def compact_dtype(colonne, valeurs):
+    """Type compact d'une colonne en mode typé, ou None si le type est conservé"""
+    if colonne in COLONNES_CATEGORIELLES:
+        return 'category'
+    valeurs = np.asarray(valeurs)
+    if valeurs.dtype.kind not in 'iuf' or len(valeurs) == 0:
+        return None
+    
+    # Années décimales conservées en float64: le float32 ne les représente pas exactement
+    if colonne == 'Annee':
+        return np.int16 if np.all(np.mod(valeurs, 1) == 0) else None
+    # Toutes les séries en float32, entières ou non: même type à toutes les résolutions (schéma des exports)
+    if colonne in SERIES_TABLE.index or colonne in COLONNES_DECIMALES:
+        return np.float32
+    return None
+
+def compact_frame(df):
+    """Convertit un DataFrame vers le schéma typé compact
+    
+    Années entières en int16, séries (comptes et pourcentages compris), valeurs du format
+    long et percentiles Monte Carlo en float32, libellés (sélection, scénario, série) en catégories.
+    """
+    types = {colonne: compact_dtype(colonne, df[colonne]) for colonne in df.columns}
+    # Colonnes déjà au type compact (exports mappés en mémoire) laissées telles quelles: pas de copie
+    types = {colonne: type_compact for colonne, type_compact in types.items()
+             if type_compact is not None and df[colonne].dtype != type_compact}
+    return df.astype(types) if types else df
+
+def canonical_frame(df):
+    """Ramène un DataFrame au schéma de génération (int64, float64, libellés texte)
+    
+    Les années et les séries entières ne sont en int64 qu'en résolution annuelle (années
+    entières): en résolution plus fine, elles restent en float64 comme à la génération.
+    """
+    annuelle = 'Annee' not in df.columns or bool(np.all(np.mod(df['Annee'].to_numpy(), 1) == 0))
+    types = {}
+    for colonne in df.columns:
+        dtype = df[colonne].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            types[colonne] = str
+            continue
+        if dtype.kind not in 'iuf':
+            continue
+        i = SERIES_TABLE.index.get(colonne)
+        entier = colonne == 'Annee' or (i is not None and SERIES_TABLE.entier[i])
+        cible = np.int64 if (dtype.kind in 'iu' and i is None) or (annuelle and entier) else np.float64
+        if dtype != cible:
+            types[colonne] = cible
+    return df.astype(types) if types else df
+
+def export_stem(*parties, **params):
+    """Nom de fichier stable d'un export (sélection, scénario, paramètres de simulation)"""
+    morceaux = [slugify(str(partie)) for partie in parties]
+    morceaux += [f"{nom}-{valeur}" for nom, valeur in sorted(params.items())]
+    return "__".join(morceaux)
+
+def export_metadata(metadata=None):
+    """Métadonnées Arrow des exports: version du schéma et métadonnées de génération"""
+    metadonnees = {'schema_version': str(EXPORT_SCHEMA_VERSION), 'model_version': model_version()}
+    for cle, valeur in (metadata or {}).items():
+        metadonnees[cle] = valeur if isinstance(valeur, str) else json.dumps(valeur, ensure_ascii=False)
+    return metadonnees
+
+def export_type(colonne, dtype):
+    """Type Arrow fixe d'une colonne exportée, indépendant de la résolution et des valeurs"""
+    if colonne in COLONNES_CATEGORIELLES:
+        return pa.dictionary(pa.int32(), pa.string())
+    if colonne == 'Annee':
+        # Années entières ou décimales: float64 les représente exactement
+        return pa.float64()
+    if colonne in SERIES_TABLE.index or colonne in COLONNES_DECIMALES:
+        return pa.float32()
+    return pa.from_numpy_dtype(dtype) if getattr(dtype, 'kind', 'O') in 'biuf' else pa.string()
+
+def export_schema(df, metadata=None):
+    """Schéma Arrow d'un export: un type fixe par colonne (export_type) et les métadonnées d'export"""
+    return pa.schema([(colonne, export_type(colonne, df[colonne].dtype)) for colonne in df.columns],
+                     metadata=export_metadata(metadata))
+
+def to_export_table(df, metadata=None):
+    """Table Arrow d'un DataFrame convertie au schéma fixe des exports"""
+    # Les métadonnées pandas (versions, types numpy d'origine) sont remplacées par celles de l'export
+    return pa.Table.from_pandas(df, preserve_index=False).cast(export_schema(df, metadata))
+
+def export_table(df, chemin, metadata=None):
+    """Écrit un DataFrame en Parquet (.parquet) ou en Arrow IPC non compressé (.arrow)
+    
+    Le schéma est fixe par colonne (export_schema): séries et percentiles en float32, années
+    en float64, libellés en dictionnaire, quelles que soient la résolution et les valeurs.
+    L'Arrow IPC non compressé peut être mappé en mémoire sans copie par `load_table`.
+    L'écriture passe par un fichier temporaire renommé atomiquement.
+    """
+    table = to_export_table(df, metadata)
+    temporaire = f"{chemin}.{os.getpid()}.tmp"
+    if chemin.endswith('.parquet'):
+        pq.write_table(table, temporaire)
+    else:
+        with pa.OSFile(temporaire, 'wb') as sink:
+            with pa_ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    os.replace(temporaire, chemin)
+
+def stream_table(blocs, chemin, format_sortie, metadata=None):
+    """Écrit un flux de DataFrames bloc par bloc (mémoire bornée par bloc), retourne le nombre de lignes
+    
+    blocs renvoie l'itérateur des blocs. En Parquet, chaque bloc est converti au
+    schéma fixe des exports (celui d'export_table) et devient un groupe de lignes. L'Arrow IPC
+    n'est pas produit par blocs: plusieurs lots par colonne imposeraient une copie au
+    chargement mappé en mémoire.
+    """
+    lignes = 0
+    temporaire = f"{chemin}.{os.getpid()}.tmp"
+    if format_sortie == 'parquet':
+        writer = None
+        try:
+            for bloc in blocs():
+                table = to_export_table(bloc, metadata)
+                if writer is None:
+                    writer = pq.ParquetWriter(temporaire, table.schema)
+                writer.write_table(table)
+                lignes += len(bloc)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with open(temporaire, 'w', encoding='utf-8', newline='') as f:
+            if format_sortie == 'json':
+                f.write('[')
+            for bloc in blocs():
+                if len(bloc) == 0:
+                    continue
+                if format_sortie == 'csv':
+                    bloc.to_csv(f, index=False, header=lignes == 0)
+                else:
+                    # Enregistrements du bloc sans les crochets, séparés par une virgule entre blocs
+                    enregistrements = bloc.to_json(orient='records', force_ascii=False, indent=2).strip()[1:-1]
+                    f.write((',' if lignes else '') + enregistrements.rstrip())
+                lignes += len(bloc)
+            if format_sortie == 'json':
+                f.write('\n]' if lignes else ']')
+    os.replace(temporaire, chemin)
+    return lignes
+
+def load_table(chemin):
+    """Charge un export columnaire, mappé en mémoire (zéro copie pour l'Arrow IPC)"""
+    if chemin.endswith('.parquet'):
+        table = pq.read_table(chemin, memory_map=True)
+    else:
+        table = pa_ipc.open_file(pa.memory_map(chemin)).read_all()
+    return table.to_pandas(split_blocks=True)
+
+def read_export_metadata(chemin):
+    """Métadonnées de génération d'un export columnaire"""
+    if chemin.endswith('.parquet'):
+        schema = pq.read_schema(chemin)
+    else:
+        schema = pa_ipc.open_file(pa.memory_map(chemin)).schema
+    return {cle.decode('utf-8'): valeur.decode('utf-8') for cle, valeur in (schema.metadata or {}).items()}
+
+class SeriesTable:
+    """Table de tableaux NumPy compilée depuis SERIES_MODELES, évaluée en un seul noyau vectorisé"""
+    def __init__(self, modeles):
+        self.series = [modele['serie'] for modele in modeles]
+        self.index = {serie: i for i, serie in enumerate(self.series)}
+        self.priorites = [modele.get('priorite') for modele in modeles]
+        self.entier = np.array([modele.get('entier', False) for modele in modeles])
+        
+        # Paramètres lus dans la config au moment de l'évaluation: {champ: {ligne: (clé, défaut)}}
+        self.base = np.zeros(len(modeles))
+        self.echelle = np.ones(len(modeles))
+        self.pente = np.zeros(len(modeles))
+        self.depuis_config = {'base': {}, 'echelle': {}, 'pente': {}}
+        for i, modele in enumerate(modeles):
+            for champ, depuis_config in self.depuis_config.items():
+                valeur = modele.get(champ)
+                if isinstance(valeur, tuple):
+                    depuis_config[i] = valeur
+                elif valeur is not None:
+                    getattr(self, champ)[i] = valeur
+        
+        # Valeur par défaut de chaque clé de config lue par la table
+        self.cles_config = {cle: defaut for depuis_config in self.depuis_config.values()
+                            for cle, defaut in depuis_config.values()}
+        
+        # Graphe de dépendances: clés de config lues par chaque série (le vecteur des
+        # années et la liste des priorités valent pour toutes les séries)
+        self.dependances = [
+            frozenset(depuis_config[i][0] for depuis_config in self.depuis_config.values() if i in depuis_config)
+            for i in range(len(modeles))
+        ]
+        
+        self.plancher = np.array([modele.get('plancher', -np.inf) for modele in modeles], dtype=float)
+        self.plafond = np.array([modele.get('plafond', np.inf) for modele in modeles], dtype=float)
+        self.amplitude = np.array([modele.get('saison', (0, 1))[0] for modele in modeles], dtype=float)
+        self.periode = np.array([modele.get('saison', (0, 1))[1] for modele in modeles], dtype=float)
+        
+        # Paliers et facteurs complétés jusqu'au nombre maximal par série (colonnes inactives)
+        n_paliers = max([len(modele.get('paliers', [])) for modele in modeles] + [1])
+        self.seuils = np.full((len(modeles), n_paliers), np.inf)
+        self.sauts = np.zeros((len(modeles), n_paliers))
+        self.pentes_paliers = np.zeros((len(modeles), n_paliers))
+        n_facteurs = max([len(modele.get('facteurs', [])) for modele in modeles] + [1])
+        self.facteurs_debut = np.full((len(modeles), n_facteurs), np.inf)
+        self.facteurs_fin = np.full((len(modeles), n_facteurs), np.inf)
+        self.facteurs = np.ones((len(modeles), n_facteurs))
+        for i, modele in enumerate(modeles):
+            for k, (annee, saut, pente) in enumerate(modele.get('paliers', [])):
+                self.seuils[i, k], self.sauts[i, k], self.pentes_paliers[i, k] = annee, saut, pente
+            for k, (debut, fin, facteur) in enumerate(modele.get('facteurs', [])):
+                self.facteurs_debut[i, k] = debut
+                self.facteurs_fin[i, k] = np.inf if fin is None else fin
+                self.facteurs[i, k] = facteur
+    
+    def invalidated(self, cles):
+        """Indices des séries à recalculer quand ces clés de config changent"""
+        cles = set(cles)
+        return [i for i, dependances in enumerate(self.dependances) if dependances & cles]
+    
+    def select(self, priorites):
+        """Indices des séries calculées pour ces priorités, dans l'ordre de la table"""
+        return [i for i, priorite in enumerate(self.priorites) if priorite is None or priorite in priorites]
+    
+    def evaluate_batch(self, annees, configs, indices=None):
+        """Évalue les séries demandées pour plusieurs configs: tableau (configs, séries, périodes)
+        
+        Seuls la base, l'échelle et la pente dépendent de la config: paliers, facteurs et saison
+        sont calculés une fois et diffusés sur toutes les configs.
+        """
+        annees = np.asarray(annees)
+        indices = np.arange(len(self.series)) if indices is None else np.asarray(indices, dtype=int)
+        t = annees - 2000
+        
+        parametres = {champ: np.tile(getattr(self, champ)[indices], (len(configs), 1)) for champ in self.depuis_config}
+        for champ, depuis_config in self.depuis_config.items():
+            for j, i in enumerate(indices):
+                if i in depuis_config:
+                    for c, config in enumerate(configs):
+                        parametres[champ][c, j] = config.get(*depuis_config[i])
+        base, echelle, pente = parametres['base'], parametres['echelle'], parametres['pente']
+        
+        valeurs = base[:, :, None] + pente[:, :, None] * t
+        seuils = self.seuils[indices]
+        for k in range(seuils.shape[1]):
+            seuil = seuils[:, k, None]
+            valeurs += np.where(annees >= seuil, self.sauts[indices, k, None], 0)
+            valeurs += self.pentes_paliers[indices, k, None] * np.maximum(annees - seuil, 0)
+        
+        # Parcours inverse des intervalles: le premier intervalle qui contient l'année l'emporte
+        facteur = np.ones(valeurs.shape[1:])
+        for k in reversed(range(self.facteurs.shape[1])):
+            dans_intervalle = ((annees >= self.facteurs_debut[indices, k, None])
+                               & (annees <= self.facteurs_fin[indices, k, None]))
+            facteur = np.where(dans_intervalle, self.facteurs[indices, k, None], facteur)
+        
+        valeurs = echelle[:, :, None] * valeurs * facteur
+        valeurs += self.amplitude[indices, None] * np.sin(2 * np.pi * t / self.periode[indices, None])
+        np.clip(valeurs, self.plancher[indices, None], self.plafond[indices, None], out=valeurs)
+        return valeurs
+    
+    def evaluate(self, annees, config, indices=None):
+        """Évalue les séries demandées sur le vecteur des années: dict série -> tableau"""
+        annees = np.asarray(annees)
+        indices = np.arange(len(self.series)) if indices is None else np.asarray(indices, dtype=int)
+        valeurs = self.evaluate_batch(annees, [config], indices)[0]
+        
+        entier = np.issubdtype(annees.dtype, np.integer)
+        return {
+            self.series[i]: valeurs[j].astype(np.int64) if entier and self.entier[i] else valeurs[j]
+            for j, i in enumerate(indices)
+        }
+
+SERIES_TABLE = SeriesTable(SERIES_MODELES)
+
+class DefenseJaponSimulation:
+    def __init__(self, dataset_cache=None, data_dir=None, store=None, whatif_cache=None):
+        self.branches_options = self.define_branches_options()
+        self.programmes_options = self.define_programmes_options()
+        self.missile_systems = self.define_missile_systems()
+        self.naval_assets = self.define_naval_assets()
+        self.dataset_cache = dataset_cache if dataset_cache is not None else LRUCache()
+        self.whatif_cache = whatif_cache if whatif_cache is not None else LRUCache(WHATIF_CACHE_MAX_ENTRIES)
+        self.data_dir = data_dir if data_dir is not None else DATA_DIR
+        self.store = store
+        self.profiler = None
+    
+    def shared_compute(self, key, compute):
+        """Calcul partagé entre processus via le magasin sur disque, s'il est configuré"""
+        if self.store is None:
+            return compute()
+        return self.store.get_or_compute(key, compute)
+    
+    def enable_profiling(self, profiler):
+        """Active le chronométrage des méthodes de génération et de simulation de l'instance"""
+        self.profiler = profiler
+        for nom in dir(self):
+            if nom.startswith('simulate_') or nom.startswith('generate_') or nom.startswith('get_cached_'):
+                setattr(self, nom, profiler.wrap(getattr(self, nom), nom, 'simulation'))
+    
+    def profile(self, nom, categorie='section'):
+        """Contexte chronométré si le profilage est actif, neutre sinon"""
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.section(nom, categorie)
+    
+    def define_branches_options(self):
+        return [
+            "Forces d'Auto-Défense Japonaises", "Forces Terrestres d'Auto-Défense", 
+            "Forces Maritimes d'Auto-Défense", "Forces Aériennes d'Auto-Défense",
+            "Commandement de la Défense Spatiale", "Commandement Cyber",
+            "Garde Côtière Japonaise", "Unité des Opérations Spéciales"
+        ]
+    
+    def define_programmes_options(self):
+        return [
+            "Défense Anti-Missile Intégrée", "Capacités de Contre-Attaque",
+            "Défense des Îles Éloignées", "Modernisation des Forces Maritimes",
+            "Supériorité Aérospatiale", "Coopération Alliance USA-Japon",
+            "Cyber Défense Avancée", "Défense Spatiale"
+        ]
+    
+    def define_missile_systems(self):
+        return {
+            "SM-3 Block IIA": {"type": "Interceptor ABM", "portee": 2500, "altitude": 1000, "statut": "Opérationnel"},
+            "PAC-3 MSE": {"type": "Défense AA/BM", "portee": 35, "altitude": 20, "statut": "Opérationnel"},
+            "Type 03 Chu-SAM": {"type": "Défense AA", "portee": 50, "altitude": 10, "statut": "Opérationnel"},
+            "12-Type SSM": {"type": "Missile Anti-Navire", "portee": 200, "vitesse": "Mach 0.9", "statut": "Opérationnel"},
+            "ASM-3": {"type": "Missile Air-Sol", "portee": 400, "vitesse": "Mach 3", "statut": "Déploiement"}
+        }
+    
+    def define_naval_assets(self):
+        return {
+            "Classe Izumo": {"type": "Porte-hélicoptères", "deplacement": 27000, "aeronav": "28 hélicoptères", "statut": "Opérationnel"},
+            "Classe Maya": {"type": "Destroyer AEGIS", "deplacement": 10800, "armement": "SM-3, SM-6", "statut": "Opérationnel"},
+            "Classe Soryu": {"type": "Sous-marin", "deplacement": 4200, "propulsion": "AIP", "statut": "Opérationnel"},
+            "Classe Mogami": {"type": "Frégate", "deplacement": 5500, "armement": "Missiles mer-mer", "statut": "Opérationnel"}
+        }
+    
+    def generate_advanced_data(self, selection, debut=HORIZON_DEBUT, fin=HORIZON_FIN, periodes_par_an=1,
+                               compact=False, ajustements=()):
+        """Génère des données avancées et détaillées pour le Japon"""
+        chrono = time.perf_counter()
+        annees = build_time_axis(debut, fin, periodes_par_an)
+        
+        config = {**self.get_advanced_config(selection), **dict(ajustements)}
+        data = self.simulate_all_series(annees, config)
+        df = pd.DataFrame(data)
+        if compact:
+            df = compact_frame(df)
+        
+        GENERATE_SECONDS.observe(time.perf_counter() - chrono)
+        return df, config
+    
+    def recompute_advanced_data(self, precedent, config_precedente, config, compact=False):
+        """Recalcule seulement les colonnes invalidées par le changement de config
+        
+        Les autres colonnes sont reprises de la trame précédente sans copie. Retourne
+        la nouvelle trame et la liste des séries recalculées.
+        """
+        cles = {cle for cle in set(config) | set(config_precedente) if config.get(cle) != config_precedente.get(cle)}
+        annees = precedent['Annee'].to_numpy()
+        if np.issubdtype(annees.dtype, np.integer):
+            annees = annees.astype(np.int64)
+        
+        indices = SERIES_TABLE.select(config.get('priorites', []))
+        invalidees = set(SERIES_TABLE.invalidated(cles))
+        a_recalculer = [i for i in indices if i in invalidees or SERIES_TABLE.series[i] not in precedent.columns]
+        nouvelles = SERIES_TABLE.evaluate(annees, config, a_recalculer)
+        if compact:
+            nouvelles = {serie: valeurs.astype(compact_dtype(serie, valeurs)) for serie, valeurs in nouvelles.items()}
+        
+        data = {'Annee': precedent['Annee']}
+        for i in indices:
+            serie = SERIES_TABLE.series[i]
+            data[serie] = nouvelles[serie] if serie in nouvelles else precedent[serie]
+        return freeze_dataframe(data), list(nouvelles)
+    
+    def iter_advanced_data(self, selection, debut=HORIZON_DEBUT, fin=HORIZON_FIN, periodes_par_an=1,
+                           annees_par_bloc=ANNEES_PAR_BLOC, compact=False):
+        """Génère les données par blocs d'années successifs (mémoire bornée par bloc)"""
+        config = self.get_advanced_config(selection)
+        for bloc_debut in range(debut, fin + 1, annees_par_bloc):
+            bloc_fin = min(bloc_debut + annees_par_bloc - 1, fin)
+            annees = build_time_axis(bloc_debut, bloc_fin, periodes_par_an)
+            bloc = pd.DataFrame(self.simulate_all_series(annees, config))
+            yield compact_frame(bloc) if compact else bloc
+    
+    def generate_comparison_data(self, selections, debut=HORIZON_DEBUT, fin=HORIZON_FIN, periodes_par_an=1,
+                                 compact=False):
+        """Séries de plusieurs sélections calculées en une passe groupée, au format long
+        
+        Colonnes Selection, Annee, Serie et Valeur; chaque sélection ne garde que les
+        séries de ses priorités, comme generate_advanced_data.
+        """
+        annees = build_time_axis(debut, fin, periodes_par_an)
+        configs = [self.get_advanced_config(selection) for selection in selections]
+        valeurs = SERIES_TABLE.evaluate_batch(annees, configs)
+        
+        actives = np.zeros(valeurs.shape[:2], dtype=bool)
+        for c, config in enumerate(configs):
+            actives[c, SERIES_TABLE.select(config.get('priorites', []))] = True
+        lignes, series = np.nonzero(actives)
+        
+        df = pd.DataFrame({
+            'Selection': np.repeat(np.asarray(selections, dtype=object)[lignes], len(annees)),
+            'Annee': np.tile(annees, len(lignes)),
+            'Serie': np.repeat(np.asarray(SERIES_TABLE.series, dtype=object)[series], len(annees)),
+            'Valeur': valeurs[lignes, series].ravel()
+        })
+        return compact_frame(df) if compact else df
+    
+    def get_cached_data(self, selection, **params):
+        """Retourne le jeu de données (lecture seule) et la config depuis le cache"""
+        if params.get('ajustements'):
+            # Paires (clé, valeur) triées: clé de cache hachable et indépendante de l'ordre
+            params['ajustements'] = tuple(sorted(dict(params['ajustements']).items()))
+        key = make_cache_key(selection, **params)
+        
+        def compute():
+            compact = params.get('compact', False)
+            ajustements = params.get('ajustements')
+            if ajustements:
+                # Réutilise la trame de référence en cache: seules les séries invalidées sont recalculées
+                reference, config_reference = self.get_cached_data(
+                    selection, **{k: v for k, v in params.items() if k != 'ajustements'})
+                config = {**config_reference, **dict(ajustements)}
+                df, _ = self.recompute_advanced_data(reference, config_reference, config, compact)
+                return df, freeze_config(config)
+            
+            # Les exports sont au schéma compact: chargés sans copie en mode compact
+            df = self.load_export(selection, **{k: v for k, v in params.items() if k != 'compact'})
+            if df is None:
+                df, config = self.shared_compute(key, lambda: self.generate_advanced_data(selection, **params))
+            else:
+                config = self.get_advanced_config(selection)
+                df = compact_frame(df) if compact else canonical_frame(df)
+            return freeze_dataframe(df), freeze_config(config)
+        
+        cache = self.whatif_cache if params.get('ajustements') else self.dataset_cache
+        df, config = cache.get_or_compute(key, compute)
+        # Copie superficielle par appel (sans copie des données): affecter une colonne ne touche pas l'entrée partagée
+        return df.copy(deep=False), config
+    
+    def get_cached_scenario_bands(self, selection, scenario, **params):
+        """Retourne les bandes de percentiles Monte Carlo (lecture seule) et le nombre de trajectoires depuis le cache"""
+        key = make_cache_key(('monte_carlo', selection, scenario), **params)
+        
+        def compute():
+            compact = params.get('compact', False)
+            bandes = self.load_export('monte_carlo', selection, scenario,
+                                      **{k: v for k, v in params.items() if k != 'compact'})
+            if bandes is None:
+                bandes, n_trajectoires = self.shared_compute(
+                    key, lambda: self.generate_scenario_bands(selection, scenario, **params))
+            else:
+                bandes = compact_frame(bandes) if compact else canonical_frame(bandes)
+                annees = build_time_axis(params.get('debut', HORIZON_DEBUT), params.get('fin', HORIZON_FIN),
+                                         params.get('periodes_par_an', 1))
+                n_trajectoires = monte_carlo_trajectories(
+                    params.get('n_trajectoires', MONTE_CARLO_TRAJECTOIRES), len(annees))
+            return freeze_dataframe(bandes), n_trajectoires
+        
+        bandes, n_trajectoires = self.dataset_cache.get_or_compute(key, compute)
+        return bandes.copy(deep=False), n_trajectoires
+    
+    def get_cached_comparison(self, selections, **params):
+        """Retourne le jeu de données comparatif (lecture seule) depuis le cache"""
+        key = make_cache_key(('comparaison',) + tuple(selections), **params)
+        return self.dataset_cache.get_or_compute(key, lambda: freeze_dataframe(
+            self.shared_compute(key, lambda: self.generate_comparison_data(selections, **params)))).copy(deep=False)
+    
+    def load_export(self, *parties, **params):
+        """Charge l'export columnaire correspondant depuis data_dir, ou None s'il n'existe pas ou est périmé"""
+        if not self.data_dir:
+            return None
+        stem = export_stem(*parties, **params)
+        for extension in ('arrow', 'parquet'):
+            chemin = os.path.join(self.data_dir, f"{stem}.{extension}")
+            if not os.path.exists(chemin):
+                continue
+            metadonnees = read_export_metadata(chemin)
+            attendu = {'schema_version': str(EXPORT_SCHEMA_VERSION), 'model_version': model_version()}
+            if any(metadonnees.get(cle) != valeur for cle, valeur in attendu.items()):
+                # Export d'un autre schéma ou d'une autre version du modèle: régénéré
+                LOGGER.warning("Export ignoré (schéma %s, modèle %s; attendu %s): %s",
+                               metadonnees.get('schema_version'), metadonnees.get('model_version'),
+                               attendu, chemin)
+                continue
+            return load_table(chemin)
+        return None
+    
+    def simulate_scenario_monte_carlo(self, annees, config, scenario,
+                                      n_trajectoires=MONTE_CARLO_TRAJECTOIRES, seed=MONTE_CARLO_SEED):
+        """Tirages Monte Carlo groupés des trajectoires perturbées selon le scénario
+        
+        Retourne un dict série -> tableau (trajectoires, périodes). Chaque trajectoire
+        combine une marche aléatoire relative et un choc de scénario tiré par trajectoire,
+        appliqué à partir de l'année de déclenchement. Au-delà de MONTE_CARLO_MAX_ELEMENTS
+        valeurs par série, le nombre de trajectoires est réduit (avertissement journalisé).
+        """
+        if scenario not in SCENARIOS:
+            raise ValueError(f"Scénario inconnu: {scenario}")
+        parametres = SCENARIOS[scenario]
+        annees = np.asarray(annees)
+        effectif = monte_carlo_trajectories(n_trajectoires, len(annees))
+        if effectif < n_trajectoires:
+            LOGGER.warning("Monte Carlo %s: %d trajectoires au lieu de %d (borne de %d valeurs pour %d périodes)",
+                           scenario, effectif, n_trajectoires, MONTE_CARLO_MAX_ELEMENTS, len(annees))
+        n_trajectoires = effectif
+        rng = np.random.default_rng(seed)
+        
+        # Pas de temps en années pour mettre la volatilité annuelle à l'échelle
+        premier_pas = annees[1] - annees[0] if len(annees) > 1 else 1
+        pas = np.diff(annees, prepend=annees[0] - premier_pas).astype(np.float32)
+        declenchement = (annees >= parametres['annee_choc'] if parametres['annee_choc'] is not None
+                         else np.zeros(annees.shape, dtype=bool))
+        
+        bases = self.simulate_series(MONTE_CARLO_SERIES, annees, config)
+        
+        trajectoires = {}
+        for serie in MONTE_CARLO_SERIES:
+            bruit = rng.standard_normal((n_trajectoires, len(annees)), dtype=np.float32)
+            bruit *= parametres['volatilite'] * np.sqrt(pas)
+            perturbation = np.cumsum(bruit, axis=1)
+            
+            moyenne, ecart_type = parametres['chocs'].get(serie, (0.0, 0.0))
+            choc = moyenne + ecart_type * rng.standard_normal((n_trajectoires, 1), dtype=np.float32)
+            perturbation += choc * declenchement
+            
+            valeurs = bases[serie].astype(np.float32) * (1 + perturbation)
+            if serie in MONTE_CARLO_POURCENTAGES:
+                np.clip(valeurs, 0, 100, out=valeurs)
+            trajectoires[serie] = valeurs
+        
+        return trajectoires
+    
+    def generate_scenario_bands(self, selection, scenario, debut=HORIZON_DEBUT, fin=HORIZON_FIN,
+                                periodes_par_an=1, n_trajectoires=MONTE_CARLO_TRAJECTOIRES,
+                                seed=MONTE_CARLO_SEED, compact=False):
+        """Bandes de percentiles (P5/P50/P95) des trajectoires Monte Carlo, au format long
+        
+        La graine des tirages est dérivée de (seed, sélection, scénario) par task_seed: le
+        dashboard, l'export et le balayage parallèle produisent les mêmes bandes. Retourne
+        les bandes et le nombre de trajectoires effectivement tirées (monte_carlo_trajectories).
+        """
+        annees = build_time_axis(debut, fin, periodes_par_an)
+        config = self.get_advanced_config(selection)
+        trajectoires = self.simulate_scenario_monte_carlo(
+            annees, config, scenario, n_trajectoires, task_seed(seed, selection, scenario))
+        
+        blocs = []
+        for serie, valeurs in trajectoires.items():
+            percentiles = np.percentile(valeurs, MONTE_CARLO_PERCENTILES, axis=0)
+            bloc = {'Annee': annees, 'Serie': np.full(len(annees), serie)}
+            for p, valeurs_p in zip(MONTE_CARLO_PERCENTILES, percentiles):
+                bloc[f'P{p}'] = valeurs_p
+            blocs.append(pd.DataFrame(bloc))
+        
+        bandes = pd.concat(blocs, ignore_index=True)
+        n_effectif = len(next(iter(trajectoires.values())))
+        return (compact_frame(bandes) if compact else bandes), n_effectif
+    
+    def simulate_all_series(self, annees, config):
+        """Calcule toutes les séries de la config en une passe vectorisée sur le vecteur des années"""
+        annees = np.asarray(annees)
+        indices = SERIES_TABLE.select(config.get('priorites', []))
+        return {'Annee': annees, **SERIES_TABLE.evaluate(annees, config, indices)}
+    
+    def simulate_series(self, series, annees, config):
+        """Calcule les séries nommées, quelles que soient les priorités de la config"""
+        inconnues = [serie for serie in series if serie not in SERIES_TABLE.index]
+        if inconnues:
+            raise ValueError(f"Série(s) inconnue(s): {', '.join(inconnues)}")
+        return SERIES_TABLE.evaluate(annees, config, [SERIES_TABLE.index[serie] for serie in series])
+    
+    def get_advanced_config(self, selection):
+        """Configuration avancée avec plus de détails pour le Japon"""
+        configs = {
+            "Forces d'Auto-Défense Japonaises": {
+                "type": "armee_totale",
+                "budget_base": 50.0,
+                "personnel_base": 240,
+                "exercices_base": 80,
+                "priorites": ["defense_missile", "maritime", "aerospatial", "cyber", "alliance"],
+                "doctrines": ["Défense Collective", "Réponse Dynamique", "Dissuasion Intégrée"],
+                "capacites_speciales": ["Défense BMD", "Opérations Amphibies", "Guerre ASW"]
+            },
+            "Forces Maritimes d'Auto-Défense": {
+                "type": "branche_navale",
+                "personnel_base": 45,
+                "exercices_base": 25,
+                "priorites": ["bmd", "asw", "amphibie", "mines"],
+                "flottes_principales": ["Flotte d'Escorte", "Flotte Sous-marine", "Aviation Navale"],
+                "navires_cles": ["Destroyers AEGIS", "Sous-marins Soryu", "Porte-hélicoptères Izumo"]
+            },
+            "Forces Aériennes d'Auto-Défense": {
+                "type": "branche_aerienne",
+                "personnel_base": 50,
+                "exercices_base": 30,
+                "priorites": ["interception", "bmd", "isr", "transport"],
+                "squadrons_cles": ["F-15J", "F-2", "F-35A", "E-767 AWACS"],
+                "bases_principales": ["Kadena", "Misawa", "Hyakuri"]
+            },
+            "Défense Anti-Missile Intégrée": {
+                "type": "programme_strategique",
+                "budget_base": 8.0,
+                "priorites": ["intercepteurs", "radars", "commandement", "integration_usa"],
+                "composantes": ["AEGIS Ashore", "PAC-3", "SM-3", "Radars J/FPS-5"],
+                "couverture": "Archipel japonais et bases US"
+            }
+        }
+        
+        return configs.get(selection, {
+            "type": "branche",
+            "personnel_base": 30,
+            "exercices_base": 20,
+            "priorites": ["defense_generique"]
+        })
+
+def task_seed(seed, selection, scenario):
+    """Graine déterministe propre à une tâche, indépendante de l'ordre de la grille"""
+    empreinte = hashlib.sha256(f"{seed}|{selection}|{scenario}".encode('utf-8')).digest()
+    return int.from_bytes(empreinte[:8], 'little')
+
+def run_scenario_task(task):
+    """Exécute une tâche Monte Carlo (sélection x scénario) dans un processus de travail"""
+    selection, scenario, seed, params = task
+    simulation = DefenseJaponSimulation()
+    bandes, _ = simulation.generate_scenario_bands(selection, scenario, seed=seed, **params)
+    bandes.insert(0, 'Scenario', scenario)
+    bandes.insert(0, 'Selection', selection)
+    return bandes
+
+def run_scenario_sweep(selections=None, scenarios=None, max_workers=None, seed=MONTE_CARLO_SEED, **params):
+    """Balaye la grille sélections x scénarios sur un pool de processus
+    
+    Chaque tâche reçoit une graine dérivée de (seed, sélection, scénario), le résultat
+    est donc reproductible quel que soit le nombre de processus. Les bandes de
+    percentiles sont fusionnées en une seule table au format long.
+    """
+    if selections is None:
+        simulation = DefenseJaponSimulation()
+        selections = simulation.branches_options + simulation.programmes_options
+    if scenarios is None:
+        scenarios = list(SCENARIOS)
+    
+    # La graine de chaque tâche est dérivée dans generate_scenario_bands
+    tasks = [(selection, scenario, seed, params)
+             for selection in selections for scenario in scenarios]
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    chunksize = max(1, len(tasks) // (max_workers * 4))
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        resultats = list(executor.map(run_scenario_task, tasks, chunksize=chunksize))
+    
+    # Sélection et scénario deviennent des catégories sur la table fusionnée
+    bandes = pd.concat(resultats, ignore_index=True)
+    return compact_frame(bandes) if params.get('compact') else bandes
+
+def slugify(texte):
+    """Nom de fichier ASCII stable à partir d'un libellé de sélection"""
+    texte = unicodedata.normalize('NFKD', texte).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^A-Za-z0-9]+', '_', texte).strip('_').lower()
+
+def write_table(df, chemin, format_sortie, metadata=None):
+    """Écrit un DataFrame dans le format de sortie demandé"""
+    if format_sortie == 'csv':
+        df.to_csv(chemin, index=False)
+    elif format_sortie == 'json':
+        df.to_json(chemin, orient='records', force_ascii=False, indent=2)
+    else:
+        export_table(df, chemin, metadata)
+
+def measure_import(module):
+    """Temps d'import d'un module dans un interpréteur neuf et modules UI alors chargés"""
+    code = (
+        "import json, sys, time\n"
+        "debut = time.perf_counter()\n"
+        f"import {module}\n"
+        "duree = (time.perf_counter() - debut) * 1000\n"
+        f"print(json.dumps({{'ms': duree, 'modules': [m for m in {MODULES_UI!r} if m in sys.modules]}}))\n"
+    )
+    resultat = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)))
+    return json.loads(resultat.stdout.strip().splitlines()[-1])
+
+def check_import_budget(repetitions=3):
+    """Vérifie les budgets de temps d'import, retourne la liste des dépassements"""
+    echecs = []
+    for module, budget_ms in IMPORT_TIME_BUDGET_MS.items():
+        mesures = [measure_import(module) for _ in range(repetitions)]
+        duree = min(mesure['ms'] for mesure in mesures)
+        print(f"{module}: {duree:.0f} ms (budget {budget_ms} ms)")
+        if duree > budget_ms:
+            echecs.append(f"{module}: {duree:.0f} ms > budget {budget_ms} ms")
+        if module == 'simulation_japon' and mesures[0]['modules']:
+            echecs.append(f"{module} charge des modules UI à l'import: {', '.join(mesures[0]['modules'])}")
+    return echecs
+
+def build_cli_parser():
+    """Parseur de la ligne de commande du mode headless"""
+    parser = argparse.ArgumentParser(
+        prog="python -m simulation_japon",
+        description="Génération headless des jeux de données (sans serveur Streamlit)"
+    )
+    commandes = parser.add_subparsers(dest='commande', required=True)
+    
+    generate = commandes.add_parser('generate', help="Génère les jeux de données par sélection")
+    generate.add_argument('--selection', action='append',
+                          help="Sélection à générer (répétable, défaut: toutes)")
+    generate.add_argument('--scenarios', action='store_true',
+                          help="Exporte aussi les bandes Monte Carlo de chaque scénario")
+    generate.add_argument('--out', required=True, help="Répertoire de sortie")
+    
+    sweep = commandes.add_parser('sweep', help="Balayage Monte Carlo sélections x scénarios")
+    sweep.add_argument('--selection', action='append',
+                       help="Sélection à inclure (répétable, défaut: toutes)")
+    sweep.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                       help="Scénario à inclure (répétable, défaut: tous)")
+    sweep.add_argument('--workers', type=int, default=None, help="Nombre de processus")
+    sweep.add_argument('--trajectoires', type=int, default=MONTE_CARLO_TRAJECTOIRES)
+    sweep.add_argument('--seed', type=int, default=MONTE_CARLO_SEED)
+    sweep.add_argument('--out', required=True, help="Répertoire de sortie")
+    
+    for commande in (generate, sweep):
+        commande.add_argument('--debut', type=int, default=HORIZON_DEBUT)
+        commande.add_argument('--fin', type=int, default=HORIZON_FIN)
+        commande.add_argument('--resolution', choices=list(RESOLUTIONS), default="Annuelle")
+        commande.add_argument('--format', choices=['csv', 'json', 'parquet', 'arrow'], default='csv')
+    
+    check_import = commandes.add_parser('check-import', help="Vérifie les budgets de temps d'import")
+    check_import.add_argument('--repetitions', type=int, default=3)
+    
+    return parser
+
+def main(argv=None):
+    """Point d'entrée headless: python -m simulation_japon generate|sweep|check-import ..."""
+    args = build_cli_parser().parse_args(argv)
+    
+    if args.commande == 'check-import':
+        echecs = check_import_budget(args.repetitions)
+        for echec in echecs:
+            print(f"ÉCHEC {echec}", file=sys.stderr)
+        return 1 if echecs else 0
+    
+    simulation = DefenseJaponSimulation()
+    selections = args.selection or simulation.branches_options + simulation.programmes_options
+    params = {'debut': args.debut, 'fin': args.fin, 'periodes_par_an': RESOLUTIONS[args.resolution]}
+    os.makedirs(args.out, exist_ok=True)
+    
+    if args.commande == 'generate':
+        for selection in selections:
+            chemin = os.path.join(args.out, f"{export_stem(selection, **params)}.{args.format}")
+            metadata = {'kind': 'dataset', 'selection': selection, 'params': params}
+            if args.format == 'arrow':
+                df, _ = simulation.generate_advanced_data(selection, **params)
+                write_table(df, chemin, args.format, metadata)
+                lignes = len(df)
+            else:
+                # Écrit par blocs d'années: la trame entière n'est jamais en mémoire
+                lignes = stream_table(lambda: simulation.iter_advanced_data(selection, **params),
+                                      chemin, args.format, metadata)
+            print(f"{selection}: {lignes} lignes -> {chemin}")
+            
+            for scenario in (SCENARIOS if args.scenarios else []):
+                bandes, n_trajectoires = simulation.generate_scenario_bands(selection, scenario, **params)
+                stem = export_stem('monte_carlo', selection, scenario, **params)
+                chemin = os.path.join(args.out, f"{stem}.{args.format}")
+                write_table(bandes, chemin, args.format,
+                            {'kind': 'monte_carlo', 'selection': selection, 'scenario': scenario,
+                             'n_trajectoires': n_trajectoires, 'params': params})
+                print(f"{selection} / {scenario}: {len(bandes)} lignes -> {chemin}")
+    else:
+        resultats = run_scenario_sweep(selections, args.scenario, args.workers, args.seed,
+                                       n_trajectoires=args.trajectoires, **params)
+        # Nombre de trajectoires réellement tirées par tâche (borne mémoire), à côté du nombre demandé
+        n_trajectoires = monte_carlo_trajectories(
+            args.trajectoires, len(build_time_axis(args.debut, args.fin, params['periodes_par_an'])))
+        chemin = os.path.join(args.out, f"scenarios_monte_carlo.{args.format}")
+        write_table(resultats, chemin, args.format,
+                    {'kind': 'monte_carlo_sweep', 'seed': args.seed, 'n_trajectoires': n_trajectoires,
+                     'n_trajectoires_demandees': args.trajectoires, 'params': params})
+        print(f"{len(resultats)} lignes -> {chemin}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# Caches partagés entre sessions (python -m pytest tests)
+import threading
+import time
+
+import pytest
+
+from simulation_japon import DefenseJaponSimulation, LRUCache
+
+SELECTION = "Forces d'Auto-Défense Japonaises"
+
+def test_mutation_appelant_sans_effet_sur_le_cache():
+    """Une colonne réaffectée ou une config modifiée par un appelant n'atteint pas l'entrée en cache"""
+    simulation = DefenseJaponSimulation()
+    df, config = simulation.get_cached_data(SELECTION)
+    annees = df['Annee'].to_numpy().copy()
+    
+    df['Annee'] = 0
+    df['Ajout'] = 1
+    with pytest.raises(AttributeError):
+        config['priorites'].append('intrus')
+    with pytest.raises(TypeError):
+        config['priorites'] = ['intrus']
+    
+    df, config = simulation.get_cached_data(SELECTION)
+    assert (df['Annee'].to_numpy() == annees).all()
+    assert 'Ajout' not in df.columns
+    assert 'intrus' not in config['priorites']
+    assert simulation.dataset_cache.stats()['hits'] == 1
+
+def lancer_concurrents(cache, compute, n_threads=20):
+    """Appelle get_or_compute depuis n_threads threads démarrés ensemble: (résultats, erreurs)"""
+    depart = threading.Barrier(n_threads)
+    resultats, erreurs = [], []
+    
+    def appel():
+        depart.wait()
+        try:
+            resultats.append(cache.get_or_compute('cle', compute))
+        except Exception as erreur:
+            erreurs.append(erreur)
+    
+    threads = [threading.Thread(target=appel) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return resultats, erreurs
+
+def test_requetes_concurrentes_un_seul_calcul():
+    """Les requêtes concurrentes d'une même clé partagent un seul calcul"""
+    cache = LRUCache()
+    appels = []
+    
+    def compute():
+        appels.append(1)
+        time.sleep(0.1)
+        return 'valeur'
+    
+    resultats, erreurs = lancer_concurrents(cache, compute)
+    assert erreurs == []
+    assert resultats == ['valeur'] * 20
+    assert len(appels) == 1
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['coalesced'] == 19
+
+def test_erreur_transmise_a_chaque_requete_en_attente():
+    """L'exception du calcul atteint le meneur et toutes les requêtes qui l'attendaient"""
+    cache = LRUCache()
+    appels = []
+    
+    def compute():
+        appels.append(1)
+        time.sleep(0.1)
+        raise RuntimeError("échec du calcul")
+    
+    resultats, erreurs = lancer_concurrents(cache, compute)
+    assert resultats == []
+    assert len(erreurs) == 20
+    assert all(isinstance(erreur, RuntimeError) for erreur in erreurs)
+    assert len(appels) == 1
+
+def test_calcul_en_echec_relance_au_prochain_appel():
+    """Un calcul en échec n'est pas mis en cache: l'appel suivant le relance"""
+    cache = LRUCache()
+    
+    def echec():
+        raise RuntimeError("échec du calcul")
+    
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('cle', echec)
+    assert 'cle' not in cache
+    assert cache.get_or_compute('cle', lambda: 'valeur') == 'valeur'
+    assert cache.get_or_compute('cle', echec) == 'valeur'
@@ -0,0 +1,55 @@
+# Sous-échantillonnage côté serveur des séries longues (python -m pytest tests)
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+from Dashboard import DISPLAY_MAX_POINTS, WEBGL_THRESHOLD, line_trace, lttb_indices, minmax_indices
+
+def serie(n):
+    """Série bruitée de n points sur des années décimales"""
+    x = 2000 + np.arange(n) / 52
+    y = np.sin(x) + np.random.default_rng(0).standard_normal(n)
+    return x, y
+
+@pytest.mark.parametrize('n', [DISPLAY_MAX_POINTS + 1, 1456, 10_000])
+def test_lttb_extremites_plafond_et_ordre(n):
+    """LTTB garde le premier et le dernier point, au plus DISPLAY_MAX_POINTS indices triés"""
+    x, y = serie(n)
+    indices = lttb_indices(x, y)
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert len(indices) <= DISPLAY_MAX_POINTS
+    assert np.all(np.diff(indices) > 0)
+
+@pytest.mark.parametrize('n', [DISPLAY_MAX_POINTS + 1, 1456, 10_000])
+def test_minmax_extremites_plafond_et_ordre(n):
+    """Min/max garde le premier et le dernier point, au plus DISPLAY_MAX_POINTS indices triés"""
+    _, y = serie(n)
+    indices = minmax_indices(y)
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert len(indices) <= DISPLAY_MAX_POINTS
+    assert np.all(np.diff(indices) > 0)
+    # Les extrêmes de la série sont toujours retenus
+    assert np.argmin(y) in indices and np.argmax(y) in indices
+
+@pytest.mark.parametrize('n', [1, 28, DISPLAY_MAX_POINTS])
+def test_series_courtes_inchangees(n):
+    """Une série au plus égale au plafond est transmise entière"""
+    x, y = serie(n)
+    np.testing.assert_array_equal(lttb_indices(x, y), np.arange(n))
+    np.testing.assert_array_equal(minmax_indices(y), np.arange(n))
+    trace = line_trace(x, y)
+    np.testing.assert_array_equal(trace.x, x)
+    np.testing.assert_array_equal(trace.y, y)
+
+def test_line_trace_webgl_au_dela_du_seuil():
+    """line_trace passe en Scattergl au-delà de WEBGL_THRESHOLD points envoyés"""
+    x, y = serie(WEBGL_THRESHOLD)
+    assert isinstance(line_trace(x, y), go.Scatter)
+    x, y = serie(WEBGL_THRESHOLD + 1)
+    assert isinstance(line_trace(x, y), go.Scattergl)
+    # Série longue réduite au plafond: toujours en WebGL, avec des points d'origine
+    x, y = serie(10_000)
+    trace = line_trace(x, y, customdata=np.arange(10_000))
+    assert isinstance(trace, go.Scattergl)
+    assert len(trace.x) <= DISPLAY_MAX_POINTS
+    np.testing.assert_array_equal(trace.y, y[trace.customdata])
@@ -0,0 +1,63 @@
+# Exports columnaires relus par le dashboard (python -m pytest tests)
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+import pytest
+
+from simulation_japon import RESOLUTIONS, DefenseJaponSimulation, export_stem, export_table, stream_table
+
+SELECTION = "Forces d'Auto-Défense Japonaises"
+
+@pytest.mark.parametrize('extension', ['arrow', 'parquet'])
+@pytest.mark.parametrize('periodes_par_an', list(RESOLUTIONS.values()))
+def test_rechargement_au_schema_de_generation(periodes_par_an, extension, tmp_path):
+    """Un export relu en mode non compact a exactement les types de generate_advanced_data"""
+    params = {'debut': 2000, 'fin': 2027, 'periodes_par_an': periodes_par_an}
+    df, _ = DefenseJaponSimulation().generate_advanced_data(SELECTION, **params)
+    export_table(df, os.path.join(tmp_path, f"{export_stem(SELECTION, **params)}.{extension}"))
+    
+    simulation = DefenseJaponSimulation(data_dir=str(tmp_path))
+    recharge, _ = simulation.get_cached_data(SELECTION, **params)
+    assert simulation.load_export(SELECTION, **params) is not None
+    assert recharge.dtypes.to_dict() == df.dtypes.to_dict()
+    # Les séries décimales passent par le float32 du schéma compact
+    pd.testing.assert_frame_equal(recharge, df, check_exact=False, rtol=1e-6)
+
+@pytest.mark.parametrize('selection', [SELECTION, "Scénarios Géopolitiques"])
+def test_schema_identique_a_toutes_les_resolutions(selection, tmp_path):
+    """Exports annuel et hebdomadaire (entiers ou non, par blocs ou non) au même schéma Arrow"""
+    simulation = DefenseJaponSimulation()
+    schemas = []
+    for periodes_par_an in (1, 52):
+        params = {'debut': 2000, 'fin': 2100, 'periodes_par_an': periodes_par_an}
+        df, _ = simulation.generate_advanced_data(selection, **params)
+        chemin = str(tmp_path / f"complet_{periodes_par_an}.parquet")
+        export_table(df, chemin)
+        schemas.append(pq.read_schema(chemin))
+        flux = str(tmp_path / f"flux_{periodes_par_an}.parquet")
+        stream_table(lambda: simulation.iter_advanced_data(selection, **params), flux, 'parquet')
+        schemas.append(pq.read_schema(flux))
+        chemin = str(tmp_path / f"complet_{periodes_par_an}.arrow")
+        export_table(df, chemin)
+        schemas.append(pa.ipc.open_file(pa.memory_map(chemin)).schema)
+    
+    for schema in schemas[1:]:
+        assert schema.equals(schemas[0], check_metadata=False)
+    assert str(schemas[0].field('Annee').type) == 'double'
+    assert {str(schemas[0].field(colonne).type) for colonne in schemas[0].names if colonne != 'Annee'} == {'float'}
+
+def test_bandes_monte_carlo_au_schema_fixe(tmp_path):
+    """Les bandes Monte Carlo ont aussi un schéma fixe: libellés en dictionnaire, percentiles en float32"""
+    simulation = DefenseJaponSimulation()
+    schemas = []
+    for periodes_par_an in (1, 52):
+        bandes, _ = simulation.generate_scenario_bands(SELECTION, "Crise Taïwan", periodes_par_an=periodes_par_an,
+                                                    n_trajectoires=100)
+        chemin = str(tmp_path / f"bandes_{periodes_par_an}.parquet")
+        export_table(bandes, chemin)
+        schemas.append(pq.read_schema(chemin))
+    assert schemas[0].equals(schemas[1], check_metadata=False)
+    assert str(schemas[0].field('Serie').type) == 'dictionary<values=string, indices=int32, ordered=0>'
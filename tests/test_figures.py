@@ -0,0 +1,57 @@
+# Figures Plotly allégées (python -m pytest tests)
+import base64
+import json
+
+import numpy as np
+import plotly.graph_objects as go
+
+from Dashboard import TYPED_ARRAY_MIN_LENGTH, DefenseJaponDashboardAvance, compact_figure
+
+def decode(valeurs):
+    """Valeurs d'un tableau typé Plotly (dtype + bdata base64), ou la liste telle quelle"""
+    if isinstance(valeurs, dict):
+        return np.frombuffer(base64.b64decode(valeurs['bdata']), dtype='<' + valeurs['dtype'])
+    return np.asarray(valeurs)
+
+def test_figure_allegee_redonne_les_memes_valeurs():
+    """Après compact_figure puis sérialisation JSON, x/y décodés sont ceux de la figure d'origine"""
+    x = 2000 + np.arange(336) / 12
+    traces = {
+        'decimales': go.Scatter(x=x, y=np.sin(x) * 100),
+        'entiers': go.Scatter(x=np.arange(2000, 2028), y=np.arange(28) * 3 - 40),
+        'grands_entiers': go.Scatter(x=np.arange(50), y=np.arange(50) * 100_000),
+        'float32_exact': go.Scatter(x=np.arange(40), y=np.arange(40) * 0.5),
+        'listes': go.Scatter(x=list(range(30)), y=[i / 3 for i in range(30)])
+    }
+    fig = go.Figure(list(traces.values()))
+    compacte = json.loads(compact_figure(fig).to_json())
+    
+    for origine, trace in zip(fig.data, compacte['data']):
+        assert isinstance(trace['x'], dict) and isinstance(trace['y'], dict)
+        np.testing.assert_array_equal(decode(trace['x']), np.asarray(origine.x))
+        np.testing.assert_array_equal(decode(trace['y']), np.asarray(origine.y))
+    # Plus petit type sans perte: entiers en int8/int32, décimales exactes en float32
+    assert [trace['y']['dtype'] for trace in compacte['data']] == ['f8', 'i1', 'i4', 'f4', 'f8']
+
+def test_tableaux_courts_et_libelles_restent_en_listes():
+    """Les tableaux plus courts que TYPED_ARRAY_MIN_LENGTH et les libellés ne sont pas encodés"""
+    n = TYPED_ARRAY_MIN_LENGTH - 1
+    fig = go.Figure([go.Scatter(x=list(range(n)), y=[i * 1.5 for i in range(n)]),
+                     go.Bar(x=[f"S{i}" for i in range(20)], y=list(range(20)))])
+    courte, barres = json.loads(compact_figure(fig).to_json())['data']
+    assert courte['x'] == list(range(n))
+    assert courte['y'] == [i * 1.5 for i in range(n)]
+    assert barres['x'] == [f"S{i}" for i in range(20)]
+    np.testing.assert_array_equal(decode(barres['y']), np.arange(20))
+
+def test_taille_envoyee_reprise_du_cache():
+    """La taille du JSON en cache sert au comptage des octets; hors cache et sans profilage, rien n'est mesuré"""
+    dashboard = DefenseJaponDashboardAvance()
+    build = lambda: go.Figure(go.Scatter(x=np.arange(100), y=np.arange(100) / 7))
+    
+    fig, economises, octets = dashboard.load_figure('figure', build)
+    fig_json, _ = dashboard.figure_cache.get('figure')
+    assert octets == len(fig_json)
+    # Octets économisés mesurés au remplissage du cache
+    assert economises > 0
+    assert dashboard.compact_chart(build())[1:] == (None, None)
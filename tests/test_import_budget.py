@@ -0,0 +1,6 @@
+# Budgets de temps d'import (python -m pytest tests)
+from simulation_japon import check_import_budget
+
+def test_import_budget():
+    """Aucun module ne dépasse son budget d'import ni ne charge l'UI depuis le modèle"""
+    assert check_import_budget() == []
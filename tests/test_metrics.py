@@ -0,0 +1,54 @@
+# Métriques Prometheus du dashboard (python -m pytest tests)
+import pytest
+
+from simulation_japon import Counter, Gauge, Histogram, LRUCache, MetricsRegistry, parse_port_range
+
+def test_format_d_exposition():
+    """HELP/TYPE par métrique, labels échappés, buckets cumulés puis _sum et _count"""
+    registre = MetricsRegistry()
+    requetes = registre.register(Counter('test_requetes_total', "Requêtes servies"))
+    latence = registre.register(Histogram('test_latence_seconds', "Latence", buckets=(0.1, 1.0)))
+    registre.register(Gauge('test_niveau', "Niveau")).set(3)
+    requetes.inc(onglet='Vue "générale"')
+    requetes.inc(2, onglet='Vue "générale"')
+    for valeur in (0.05, 0.5, 5.0):
+        latence.observe(valeur, onglet='menaces')
+    registre.register_cache('datasets', LRUCache())
+    
+    lignes = registre.render().splitlines()
+    assert lignes[:3] == [
+        "# HELP test_requetes_total Requêtes servies",
+        "# TYPE test_requetes_total counter",
+        'test_requetes_total{onglet="Vue \\"générale\\""} 3'
+    ]
+    debut = lignes.index("# TYPE test_latence_seconds histogram")
+    assert lignes[debut - 1] == "# HELP test_latence_seconds Latence"
+    assert lignes[debut + 1:debut + 6] == [
+        'test_latence_seconds_bucket{onglet="menaces",le="0.1"} 1',
+        'test_latence_seconds_bucket{onglet="menaces",le="1.0"} 2',
+        'test_latence_seconds_bucket{onglet="menaces",le="+Inf"} 3',
+        'test_latence_seconds_sum{onglet="menaces"} 5.55',
+        'test_latence_seconds_count{onglet="menaces"} 3'
+    ]
+    assert "# TYPE test_niveau gauge" in lignes and "test_niveau 3" in lignes
+    # Caches enregistrés et sessions actives collectés au rendu
+    assert 'defense_japon_cache_hits_total{cache="datasets"} 0' in lignes
+    assert "defense_japon_active_sessions 0" in lignes
+    # Chaque ligne est un commentaire HELP/TYPE ou un échantillon "nom{labels} valeur"
+    for ligne in lignes:
+        assert ligne.startswith(('# HELP ', '# TYPE ')) or len(ligne.rsplit(' ', 1)) == 2
+
+@pytest.mark.parametrize('valeur, ports', [
+    ('9464', range(9464, 9465)),
+    (9464, range(9464, 9465)),
+    (' 9464-9467 ', range(9464, 9468)),
+    ('1-1', range(1, 2)),
+    ('65535', range(65535, 65536))
+])
+def test_plage_de_ports(valeur, ports):
+    assert parse_port_range(valeur) == ports
+
+@pytest.mark.parametrize('valeur', ['', 'abc', '9464-', '9464-abc', '9471-9464', '0', '65536', '9464-70000', '-9464'])
+def test_plage_de_ports_invalide(valeur):
+    with pytest.raises(ValueError, match="Plage de ports invalide"):
+        parse_port_range(valeur)
@@ -0,0 +1,81 @@
+# Moteur Monte Carlo des scénarios (python -m pytest tests)
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulation_japon import MONTE_CARLO_TRAJECTOIRES, SCENARIOS, DefenseJaponSimulation, build_time_axis, run_scenario_sweep, task_seed
+
+SELECTIONS = ["Forces d'Auto-Défense Japonaises", "Défense Anti-Missile Intégrée"]
+
+@pytest.fixture(scope='module')
+def simulation():
+    return DefenseJaponSimulation()
+
+def test_meme_graine_memes_trajectoires(simulation):
+    """Une même graine redonne les mêmes tirages, une autre graine des tirages différents"""
+    annees = build_time_axis(2000, 2027, 12)
+    config = simulation.get_advanced_config(SELECTIONS[0])
+    tirages = [simulation.simulate_scenario_monte_carlo(annees, config, "Crise Taïwan", 500, seed)
+               for seed in (1, 1, 2)]
+    for serie in tirages[0]:
+        np.testing.assert_array_equal(tirages[0][serie], tirages[1][serie])
+        assert not np.array_equal(tirages[0][serie], tirages[2][serie])
+
+@pytest.mark.parametrize('scenario', list(SCENARIOS))
+def test_bandes_reproductibles(simulation, scenario):
+    """generate_scenario_bands donne les mêmes bandes à graine égale, d'autres à graine différente"""
+    params = {'n_trajectoires': 500, 'periodes_par_an': 12}
+    bandes, _ = simulation.generate_scenario_bands(SELECTIONS[0], scenario, seed=7, **params)
+    pd.testing.assert_frame_equal(simulation.generate_scenario_bands(SELECTIONS[0], scenario, seed=7, **params)[0],
+                                  bandes)
+    autres, _ = simulation.generate_scenario_bands(SELECTIONS[0], scenario, seed=8, **params)
+    assert not np.array_equal(autres['P50'].to_numpy(), bandes['P50'].to_numpy())
+
+def test_graine_propre_a_chaque_tache():
+    """task_seed est stable et différente pour chaque (graine, sélection, scénario)"""
+    graines = {(seed, selection, scenario): task_seed(seed, selection, scenario)
+               for seed in (42, 43) for selection in SELECTIONS for scenario in SCENARIOS}
+    assert len(set(graines.values())) == len(graines)
+    assert all(task_seed(*tache) == graine for tache, graine in graines.items())
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_balayage_egal_a_la_generation(simulation, max_workers):
+    """Le balayage sur pool de processus redonne les bandes de generate_scenario_bands, tâche par tâche"""
+    scenarios = ["Statut Quo", "Crise Taïwan"]
+    params = {'n_trajectoires': 300, 'periodes_par_an': 1}
+    resultats = run_scenario_sweep(SELECTIONS, scenarios, max_workers, seed=7, **params)
+    
+    attendu = []
+    for selection in SELECTIONS:
+        for scenario in scenarios:
+            bandes, _ = simulation.generate_scenario_bands(selection, scenario, seed=7, **params)
+            bandes.insert(0, 'Scenario', scenario)
+            bandes.insert(0, 'Selection', selection)
+            attendu.append(bandes)
+    pd.testing.assert_frame_equal(resultats, pd.concat(attendu, ignore_index=True))
+
+def test_trajectoires_plafonnees_signalees(simulation, caplog):
+    """Au-delà de la borne mémoire, le nombre effectif de trajectoires est retourné et journalisé"""
+    params = {'debut': 2000, 'fin': 2100, 'periodes_par_an': 52}
+    with caplog.at_level(logging.WARNING, logger='simulation_japon'):
+        bandes, n_trajectoires = simulation.generate_scenario_bands(SELECTIONS[0], "Crise Taïwan", **params)
+    # 101 ans x 52 semaines = 5252 périodes: 5 000 000 // 5252 trajectoires
+    assert n_trajectoires == 952
+    assert len(bandes) == 5252 * 4
+    assert "952 trajectoires au lieu de 10000" in caplog.text
+    
+    # Même nombre servi par le cache, sans nouveau tirage
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger='simulation_japon'):
+        assert simulation.get_cached_scenario_bands(SELECTIONS[0], "Crise Taïwan", **params)[1] == 952
+        assert simulation.get_cached_scenario_bands(SELECTIONS[0], "Crise Taïwan", **params)[1] == 952
+    assert caplog.text.count("trajectoires au lieu de") == 1
+    
+    # Sous la borne: aucun plafonnement, aucun avertissement
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger='simulation_japon'):
+        _, n_trajectoires = simulation.generate_scenario_bands(SELECTIONS[0], "Crise Taïwan")
+    assert n_trajectoires == MONTE_CARLO_TRAJECTOIRES
+    assert caplog.text == ""
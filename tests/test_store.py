@@ -0,0 +1,59 @@
+# Magasin partagé entre processus (python -m pytest tests)
+import time
+
+from simulation_japon import SharedStore
+
+def test_relecture_apres_reouverture(tmp_path):
+    """Une entrée écrite reste lisible par un magasin rouvert sur le même répertoire"""
+    SharedStore(str(tmp_path), 'test', 'v1').put(('cle', 1), {'valeurs': [1, 2, 3]})
+    
+    store = SharedStore(str(tmp_path), 'test', 'v1')
+    assert len(store) == 1
+    assert store.get(('cle', 1)) == {'valeurs': [1, 2, 3]}
+    assert store.get(('cle', 2)) is None
+    assert store.stats()['hits'] == 1
+
+def test_purge_au_changement_de_version(tmp_path):
+    """Les entrées d'une autre version du code sont supprimées à l'ouverture"""
+    SharedStore(str(tmp_path), 'test', 'v1').put('cle', 'ancienne')
+    SharedStore(str(tmp_path), 'autre', 'v1').put('cle', 'autre espace')
+    
+    store = SharedStore(str(tmp_path), 'test', 'v2')
+    assert len(store) == 0
+    assert store.get('cle') is None
+    # Les autres espaces gardent leurs entrées
+    assert SharedStore(str(tmp_path), 'autre', 'v1').get('cle') == 'autre espace'
+
+def test_eviction_des_moins_recemment_lues(tmp_path):
+    """Au-delà de max_bytes, les entrées les moins récemment lues sont évincées"""
+    store = SharedStore(str(tmp_path), 'test', 'v1', max_bytes=2500)
+    store.put('a', b'a' * 1000)
+    time.sleep(0.01)
+    store.put('b', b'b' * 1000)
+    time.sleep(0.01)
+    # Lecture reportée au prochain lot, écrit avant l'éviction
+    assert store.get('a') == b'a' * 1000
+    time.sleep(0.01)
+    store.put('c', b'c' * 1000)
+    
+    assert store.get('b') is None
+    assert store.get('a') == b'a' * 1000
+    assert store.get('c') == b'c' * 1000
+    assert store.stats()['bytes'] <= 2500
+    # Une entrée plus grande que le magasin entier n'est pas écrite
+    store.put('d', b'd' * 3000)
+    assert store.get('d') is None
+
+def test_lectures_sans_ecriture_immediate(tmp_path):
+    """Les dates d'accès des lectures sont écrites par lot, pas à chaque lecture"""
+    store = SharedStore(str(tmp_path), 'test', 'v1', flush_seconds=3600)
+    store.put('cle', 'valeur')
+    acces = store._connexion.execute("SELECT acces FROM entrees").fetchone()[0]
+    time.sleep(0.01)
+    for _ in range(10):
+        assert store.get('cle') == 'valeur'
+    assert store._connexion.execute("SELECT acces FROM entrees").fetchone()[0] == acces
+    
+    store.flush_seconds = 0
+    store.get('cle')
+    assert store._connexion.execute("SELECT acces FROM entrees").fetchone()[0] > acces
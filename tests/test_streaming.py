@@ -0,0 +1,41 @@
+# Génération par blocs d'années (python -m pytest tests)
+import pandas as pd
+import pytest
+
+from simulation_japon import DefenseJaponSimulation, export_table, load_table, stream_table
+
+SELECTIONS = ["Scénarios Géopolitiques", "Forces d'Auto-Défense Japonaises"]
+
+@pytest.fixture(scope='module')
+def simulation():
+    return DefenseJaponSimulation()
+
+@pytest.mark.parametrize('periodes_par_an', [1, 12])
+@pytest.mark.parametrize('selection', SELECTIONS)
+def test_blocs_egaux_a_la_generation_complete(simulation, selection, periodes_par_an):
+    """Les blocs mis bout à bout redonnent exactement generate_advanced_data"""
+    params = {'debut': 2000, 'fin': 2100, 'periodes_par_an': periodes_par_an}
+    df, _ = simulation.generate_advanced_data(selection, **params)
+    blocs = pd.concat(simulation.iter_advanced_data(selection, **params), ignore_index=True)
+    pd.testing.assert_frame_equal(blocs, df)
+
+@pytest.mark.parametrize('format_sortie', ['csv', 'json', 'parquet'])
+@pytest.mark.parametrize('selection', SELECTIONS)
+def test_export_par_blocs_egal_a_l_export_complet(simulation, selection, format_sortie, tmp_path):
+    """L'export écrit par blocs est identique à celui de la trame entière (valeurs et schéma compact)"""
+    params = {'debut': 2000, 'fin': 2100, 'periodes_par_an': 12}
+    df, _ = simulation.generate_advanced_data(selection, **params)
+    chemin = str(tmp_path / f"flux.{format_sortie}")
+    lignes = stream_table(lambda: simulation.iter_advanced_data(selection, **params), chemin, format_sortie)
+    assert lignes == len(df)
+    
+    if format_sortie == 'csv':
+        with open(chemin, encoding='utf-8') as f:
+            assert f.read() == df.to_csv(index=False)
+    elif format_sortie == 'json':
+        with open(chemin, encoding='utf-8') as f:
+            assert f.read() == df.to_json(orient='records', force_ascii=False, indent=2)
+    else:
+        reference = str(tmp_path / "complet.parquet")
+        export_table(df, reference)
+        pd.testing.assert_frame_equal(load_table(chemin), load_table(reference))
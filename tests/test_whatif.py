@@ -0,0 +1,38 @@
+# Recalcul incrémental what-if (python -m pytest tests)
+import pandas as pd
+import pytest
+
+from simulation_japon import RESOLUTIONS, DefenseJaponSimulation
+
+SELECTION = "Forces d'Auto-Défense Japonaises"
+
+AJUSTEMENTS = [
+    {'budget_base': 60.0},
+    {'croissance_budget': 0.035, 'personnel_base': 300},
+    {'exercices_base': 120, 'croissance_personnel': -0.01}
+]
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('ajustements', AJUSTEMENTS)
+@pytest.mark.parametrize('periodes_par_an', list(RESOLUTIONS.values()))
+def test_recalcul_egal_a_la_generation_complete(periodes_par_an, ajustements, compact):
+    """recompute_advanced_data redonne exactement generate_advanced_data avec les paramètres modifiés"""
+    simulation = DefenseJaponSimulation()
+    params = {'debut': 2000, 'fin': 2027, 'periodes_par_an': periodes_par_an, 'compact': compact}
+    reference, config_reference = simulation.generate_advanced_data(SELECTION, **params)
+    attendu, config = simulation.generate_advanced_data(SELECTION, ajustements=ajustements, **params)
+    
+    df, recalculees = simulation.recompute_advanced_data(reference, config_reference, config, compact)
+    pd.testing.assert_frame_equal(df, attendu)
+    # Seules les séries qui lisent une clé modifiée sont recalculées
+    assert recalculees and len(recalculees) < len(df.columns) - 1
+
+@pytest.mark.parametrize('periodes_par_an', list(RESOLUTIONS.values()))
+def test_variante_en_cache_egale_a_la_generation_complete(periodes_par_an):
+    """La variante what-if servie par get_cached_data (depuis la référence en cache) est celle de la génération"""
+    simulation = DefenseJaponSimulation()
+    params = {'debut': 2000, 'fin': 2027, 'periodes_par_an': periodes_par_an, 'compact': True}
+    attendu, _ = simulation.generate_advanced_data(SELECTION, ajustements=AJUSTEMENTS[1], **params)
+    df, config = simulation.get_cached_data(SELECTION, ajustements=AJUSTEMENTS[1], **params)
+    pd.testing.assert_frame_equal(df, attendu)
+    assert config['budget_base'] == 50.0 and config['personnel_base'] == 300